@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import get_settings
@@ -21,6 +23,41 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> tuple[str, dict]:
+    """
+    Map the configured sync URL onto its async driver (asyncpg / aiosqlite).
+    Returns the URL and connect_args; libpq's sslmode query parameter isn't a
+    valid asyncpg connect kwarg, so it is passed as asyncpg's ssl= instead.
+    """
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            async_url = make_url("postgresql+asyncpg://" + url[len(prefix):])
+            sslmode = async_url.query.get("sslmode")
+            if sslmode is None:
+                return async_url.render_as_string(hide_password=False), {}
+            async_url = async_url.difference_update_query(["sslmode"])
+            return async_url.render_as_string(hide_password=False), {"ssl": sslmode}
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):], {}
+    return url, {}
+
+
+# Async engine for request handlers, so queries don't block the event loop
+async_url, async_connect_args = _async_database_url(settings.database_url)
+if settings.database_url.startswith("sqlite"):
+    async_engine = create_async_engine(async_url)
+else:
+    async_engine = create_async_engine(
+        async_url,
+        connect_args=async_connect_args,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -30,3 +67,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,11 @@
+from datetime import datetime, timezone
+
+
+def now_utc() -> datetime:
+    """Timezone-aware UTC timestamp for the current request."""
+    return datetime.now(timezone.utc)
+
+
+def request_cutoff_base(now: datetime) -> datetime:
+    """Naive UTC form of `now` for comparison against naive TIMESTAMP columns."""
+    return now.replace(tzinfo=None)
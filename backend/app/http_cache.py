@@ -0,0 +1,63 @@
+"""
+HTTP caching helpers: weak ETags, Cache-Control and If-None-Match handling.
+"""
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+DEFAULT_MAX_AGE_SECONDS = 60
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values that determine a response's content."""
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match already matches `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def set_cache_headers(
+    response: Response,
+    etag: str,
+    max_age: int = DEFAULT_MAX_AGE_SECONDS,
+    stale_while_revalidate: int = 0,
+    last_modified: Optional[datetime] = None
+):
+    """Attach ETag, Cache-Control and (optionally) Last-Modified headers to a response."""
+    response.headers["ETag"] = etag
+    cache_control = f"public, max-age={max_age}"
+    if stale_while_revalidate:
+        cache_control += f", stale-while-revalidate={stale_while_revalidate}"
+    response.headers["Cache-Control"] = cache_control
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    max_age: int = DEFAULT_MAX_AGE_SECONDS,
+    stale_while_revalidate: int = 0,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Set caching headers on `response` and return a 304 response if the client
+    copy is current, otherwise None (caller builds the full response).
+    """
+    if is_not_modified(request, etag):
+        response = Response(status_code=304)
+        set_cache_headers(response, etag, max_age, stale_while_revalidate, last_modified)
+        return response
+    set_cache_headers(response, etag, max_age, stale_while_revalidate, last_modified)
+    return None
@@ -0,0 +1,50 @@
+"""
+Shared outbound HTTP client: one pooled httpx.AsyncClient reused by the
+upstream data services so repeat fetches ride warm keep-alive connections.
+HTTP/2 is negotiated where the upstream supports it (requires h2).
+"""
+from typing import Optional
+
+import httpx
+
+DEFAULT_TIMEOUT_SECONDS = 30.0
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use (or after close)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True, limits=HTTP_LIMITS, timeout=DEFAULT_TIMEOUT_SECONDS
+        )
+    return _client
+
+
+def conditional_headers(validators: Optional[dict]) -> dict:
+    """If-None-Match / If-Modified-Since headers from a previous response's validators."""
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def response_validators(response: httpx.Response) -> dict:
+    """Capture the ETag / Last-Modified validators from an upstream response."""
+    return {
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+    }
+
+
+async def close_http_client():
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
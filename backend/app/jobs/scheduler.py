@@ -1,6 +1,8 @@
-import asyncio
 import logging
+from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 
@@ -9,16 +11,34 @@ from ..services.alert_engine import AlertEngine
 from ..services.weather_cache import weather_cache
 from ..services.intel_engine import intel_engine
 from ..services.osm_facilities import fetch_all_facilities
+from ..services.cache_warmup import UPSTREAM_CACHES
+from ..services.weather_log_buffer import flush_weather_logs
+from ..services.yesterday_stats import get_yesterday_stats
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-scheduler = AsyncIOScheduler()
+# Jobs are persisted in the app database so restarts keep their schedule.
+# coalesce/max_instances stop a stalled job from overlapping or piling up runs.
+scheduler = AsyncIOScheduler(
+    jobstores={
+        "default": SQLAlchemyJobStore(url=settings.database_url),
+    },
+    job_defaults={
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": 300,
+    },
+)
 
 WEATHER_CACHE_INTERVAL_MINUTES = 60  # Refresh every 60 minutes to minimize API calls
 INTEL_ANALYSIS_INTERVAL_MINUTES = 30  # Reduced to minimize API load
 FACILITIES_REFRESH_INTERVAL_HOURS = 24  # Daily refresh for OSM facilities
+STARTUP_DELAY_SECONDS = 2  # Delay before the initial warm-up jobs fire
+UPSTREAM_REFRESH_LEAD_SECONDS = 60  # Refresh upstream caches this long before their TTL runs out
+WEATHER_LOG_FLUSH_INTERVAL_MINUTES = 5  # Bulk-write queued weather log rows
+YESTERDAY_STATS_WARM_MINUTE = 5  # Prefetch yesterday's stats at 00:05, after the date rolls over
 
 
 async def refresh_weather_cache():
@@ -56,6 +76,13 @@ async def check_weather_and_alerts():
         db.close()
 
 
+def write_weather_logs():
+    """Background job to bulk-insert queued weather log rows."""
+    written = flush_weather_logs()
+    if written:
+        logger.info(f"Wrote {written} weather log rows")
+
+
 async def refresh_intel_analysis():
     """Background job to refresh SOS intelligence analysis."""
     logger.info("Starting intelligence analysis refresh...")
@@ -84,6 +111,23 @@ async def refresh_osm_facilities():
         logger.error(f"Error refreshing OSM facilities: {e}")
 
 
+async def warm_yesterday_stats():
+    """Background job to compute yesterday's stats before the first request of the day."""
+    try:
+        stats = await get_yesterday_stats()
+        logger.info(f"Yesterday stats ready for {stats.get('date')}")
+    except Exception as e:
+        logger.error(f"Error warming yesterday stats: {e}")
+
+
+async def refresh_upstream_cache(name: str):
+    """Background job to refresh one upstream cache ahead of its expiry."""
+    try:
+        await UPSTREAM_CACHES[name].refresh()
+    except Exception as e:
+        logger.error(f"Error refreshing {name} cache: {e}")
+
+
 def start_scheduler():
     """Initialize and start the background scheduler."""
     interval_minutes = settings.alert_check_interval_minutes
@@ -106,6 +150,15 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Weather log flush - every 5 minutes
+    scheduler.add_job(
+        write_weather_logs,
+        trigger=IntervalTrigger(minutes=WEATHER_LOG_FLUSH_INTERVAL_MINUTES),
+        id="weather_logs_flush",
+        name="Write queued weather logs",
+        replace_existing=True
+    )
+
     # Intel analysis job - every 15 minutes
     scheduler.add_job(
         refresh_intel_analysis,
@@ -124,6 +177,30 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Yesterday's stats - daily, just after midnight (server local time, which
+    # is what the stats cache keys its date on)
+    scheduler.add_job(
+        warm_yesterday_stats,
+        trigger=CronTrigger(hour=0, minute=YESTERDAY_STATS_WARM_MINUTE),
+        id="yesterday_stats_warm",
+        name="Prefetch yesterday's weather stats",
+        replace_existing=True
+    )
+
+    # Upstream caches (rivers, alerts, marine, irrigation) - refreshed just
+    # before their TTL lapses so requests are served from a warm cache
+    for name, service in UPSTREAM_CACHES.items():
+        scheduler.add_job(
+            refresh_upstream_cache,
+            trigger=IntervalTrigger(
+                seconds=max(service.cache_ttl_seconds - UPSTREAM_REFRESH_LEAD_SECONDS, 60)
+            ),
+            args=[name],
+            id=f"{name}_cache_refresh",
+            name=f"Refresh {name} cache",
+            replace_existing=True
+        )
+
     scheduler.start()
     logger.info(
         f"Scheduler started. Cache: {WEATHER_CACHE_INTERVAL_MINUTES}min, "
@@ -131,14 +208,23 @@ def start_scheduler():
         f"Facilities: {FACILITIES_REFRESH_INTERVAL_HOURS}h"
     )
 
-    # Initial tasks on startup
-    asyncio.get_event_loop().create_task(refresh_weather_cache())
-    asyncio.get_event_loop().create_task(refresh_intel_analysis())
-    asyncio.get_event_loop().create_task(refresh_osm_facilities())
-
+    # Initial runs on startup: pull each job's next run forward so the first
+    # pass goes through the interval job itself and its max_instances/coalesce
+    # guards, instead of a separate one-shot that could overlap it
+    run_date = datetime.now() + timedelta(seconds=STARTUP_DELAY_SECONDS)
+    startup_job_ids = [
+        "weather_cache_refresh",
+        "intel_analysis_refresh",
+        "osm_facilities_refresh",
+        "yesterday_stats_warm",
+    ] + [f"{name}_cache_refresh" for name in UPSTREAM_CACHES]
+    for job_id in startup_job_ids:
+        scheduler.modify_job(job_id, next_run_time=run_date)
 
 def stop_scheduler():
     """Stop the background scheduler."""
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Scheduler stopped.")
+    # Don't lose weather log rows still waiting for the next flush
+    write_weather_logs()
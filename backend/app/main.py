@@ -1,16 +1,19 @@
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timezone
+import asyncio
 import logging
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from .config import get_settings
 from .database import engine, Base
+from .http_client import get_http_client, close_http_client
 from .routers import weather, alerts, subscribers, districts, intel, whatsapp, early_warning, flood_map, wind
 from .jobs.scheduler import start_scheduler, stop_scheduler
 from .schemas import HealthResponse
@@ -24,6 +27,15 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Use uvloop when available (shipped with uvicorn[standard]); falls back to
+# the stock asyncio loop otherwise.
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using uvloop event loop policy")
+except ImportError:
+    logger.info("uvloop not installed, using default asyncio event loop")
+
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
@@ -38,6 +50,9 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
 
+    # Shared pooled HTTP client for upstream data services
+    app.state.http = get_http_client()
+
     # Start background scheduler
     start_scheduler()
 
@@ -46,6 +61,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down FloodWatch LK Backend...")
     stop_scheduler()
+    await close_http_client()
 
 
 # Create FastAPI app
@@ -53,7 +69,8 @@ app = FastAPI(
     title="FloodWatch LK API",
     description="Flood monitoring and early warning system for Sri Lanka",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add rate limiting
@@ -80,11 +97,24 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_origin_regex=r"https://[a-zA-Z0-9-]+\.vercel\.app",
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists let the middleware build its preflight headers once
+    allow_methods=["GET", "POST", "PUT", "OPTIONS"],
+    allow_headers=[
+        "Accept",
+        "Accept-Language",
+        "Authorization",
+        "Content-Language",
+        "Content-Type",
+        "If-None-Match",
+        "X-API-Key",
+        "X-Requested-With",
+    ],
     expose_headers=["*"],
 )
 
+# Compress JSON responses (intel/alerts payloads are large and repetitive)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(weather.router)
 app.include_router(alerts.router)
@@ -103,7 +133,7 @@ async def health_check():
     return HealthResponse(
         status="healthy",
         version="1.0.0",
-        timestamp=datetime.utcnow()
+        timestamp=datetime.now(timezone.utc)
     )
 
 
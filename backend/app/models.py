@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, TIMESTAMP, Text
+from sqlalchemy import Column, Integer, String, Boolean, DECIMAL, TIMESTAMP, Text, Index, JSON, select, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-import json
-from .database import Base
+from .database import Base, engine
+
+# JSONB on Postgres (GIN-indexable), plain JSON elsewhere (e.g. SQLite)
+JSONList = JSON().with_variant(JSONB(), "postgresql")
 
 
 class Subscriber(Base):
@@ -9,15 +13,7 @@ class Subscriber(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     phone_number = Column(String(15), unique=True, nullable=False, index=True)
-    _districts = Column("districts", Text, default='["Colombo"]')
-
-    @property
-    def districts(self):
-        return json.loads(self._districts) if self._districts else ["Colombo"]
-
-    @districts.setter
-    def districts(self, value):
-        self._districts = json.dumps(value) if value else '["Colombo"]'
+    districts = Column(JSONList, nullable=False, default=lambda: ["Colombo"], server_default='["Colombo"]')
     language = Column(String(10), default="en")
     channel = Column(String(10), default="whatsapp")  # whatsapp, sms
     whatsapp_opted_in = Column(Boolean, default=False)  # True when user sends first message
@@ -25,6 +21,29 @@ class Subscriber(Base):
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
 
+    __table_args__ = (
+        Index("ix_subscribers_districts_gin", "districts", postgresql_using="gin"),
+        Index("ix_subscribers_channel_optin_active", "channel", "whatsapp_opted_in", "active"),
+    )
+
+
+def subscribed_to_district(district: str):
+    """SQL predicate matching subscribers whose districts list contains the district."""
+    if engine.dialect.name == "postgresql":
+        # JSONB containment, served by the GIN index
+        return type_coerce(Subscriber.districts, JSONB).contains([district])
+    entries = func.json_each(Subscriber.districts).table_valued("value")
+    return select(1).select_from(entries).where(entries.c.value == district).exists()
+
+
+def upsert_subscriber(values: dict, update: dict):
+    """INSERT a subscriber, or apply `update` to the existing row with the same phone number."""
+    insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    return insert(Subscriber).values(**values).on_conflict_do_update(
+        index_elements=[Subscriber.phone_number],
+        set_={**update, "updated_at": func.current_timestamp()},
+    )
+
 
 class AlertHistory(Base):
     __tablename__ = "alert_history"
@@ -37,6 +56,11 @@ class AlertHistory(Base):
     message = Column(Text)
     sent_at = Column(TIMESTAMP, server_default=func.current_timestamp(), index=True)
 
+    __table_args__ = (
+        Index("ix_alert_history_sent_level", "sent_at", "alert_level"),
+        Index("ix_alert_history_district_level_sent", "district", "alert_level", "sent_at"),
+    )
+
 
 class WeatherLog(Base):
     __tablename__ = "weather_logs"
@@ -47,3 +71,7 @@ class WeatherLog(Base):
     temperature_c = Column(DECIMAL(5, 2))
     humidity_percent = Column(Integer)
     recorded_at = Column(TIMESTAMP, server_default=func.current_timestamp(), index=True)
+
+    __table_args__ = (
+        Index("ix_weather_logs_district_recorded", "district", "recorded_at"),
+    )
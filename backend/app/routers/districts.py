@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import Optional
 from datetime import datetime, timedelta
+from functools import lru_cache
+from bisect import bisect_right
 import json
 import os
 
-from ..database import get_db
+import numpy as np
+
+from ..database import get_async_db
+from ..dependencies import now_utc, request_cutoff_base
+from ..http_cache import make_etag, conditional_response
 from ..models import WeatherLog
 from ..schemas import DistrictInfo
 from ..config import get_settings
@@ -16,70 +22,119 @@ router = APIRouter(prefix="/api/districts", tags=["districts"])
 settings = get_settings()
 
 
+@lru_cache(maxsize=1)
 def load_districts() -> dict:
-    """Load district data from JSON file."""
+    """Load and cache district data from JSON file."""
     data_path = os.path.join(os.path.dirname(__file__), "..", "data", "districts.json")
     with open(data_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+@lru_cache(maxsize=1)
+def _districts_by_name() -> dict[str, dict]:
+    """Lowercased district name -> district record."""
+    return {d["name"].lower(): d for d in load_districts()["districts"]}
+
+
+# Ascending thresholds; a level applies when rainfall >= its threshold
+ALERT_THRESHOLDS = (settings.threshold_yellow, settings.threshold_orange, settings.threshold_red)
+ALERT_LEVELS = ("green", "yellow", "orange", "red")
+_ALERT_THRESHOLDS_ARRAY = np.asarray(ALERT_THRESHOLDS, dtype=float)
+
+
 def get_alert_level(rainfall_mm: float) -> str:
     """Determine alert level based on rainfall."""
-    if rainfall_mm >= settings.threshold_red:
-        return "red"
-    elif rainfall_mm >= settings.threshold_orange:
-        return "orange"
-    elif rainfall_mm >= settings.threshold_yellow:
-        return "yellow"
-    return "green"
+    return ALERT_LEVELS[bisect_right(ALERT_THRESHOLDS, rainfall_mm)]
+
+
+def get_alert_levels(rainfalls: list[float]) -> list[str]:
+    """Vectorised get_alert_level for a batch of rainfall values."""
+    indices = np.searchsorted(_ALERT_THRESHOLDS_ARRAY, np.asarray(rainfalls, dtype=float), side="right")
+    return [ALERT_LEVELS[i] for i in indices]
 
 
 @router.get("", response_model=list[DistrictInfo])
-async def get_districts(db: Session = Depends(get_db)):
+async def get_districts(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    now: datetime = Depends(now_utc)
+):
     """Get list of all monitored districts with their current status."""
     district_data = load_districts()
-    result = []
-
-    for district in district_data["districts"]:
-        # Get latest weather log for this district
-        latest_log = db.query(WeatherLog).filter(
-            WeatherLog.district == district["name"],
-            WeatherLog.recorded_at >= datetime.utcnow() - timedelta(hours=24)
-        ).order_by(WeatherLog.recorded_at.desc()).first()
+    cutoff = request_cutoff_base(now) - timedelta(hours=24)
+
+    # ETag from the newest log and the number of logs in the window, so it
+    # changes both when new logs arrive and when old ones age out
+    window = await db.execute(
+        select(
+            func.max(WeatherLog.recorded_at),
+            func.count(WeatherLog.id)
+        ).where(WeatherLog.recorded_at >= cutoff)
+    )
+    newest, window_count = window.one()
+    not_modified = conditional_response(request, response, make_etag(newest, window_count))
+    if not_modified:
+        return not_modified
+
+    # Latest log per district in a single query (portable across Postgres/SQLite)
+    latest = select(
+        WeatherLog.district,
+        func.max(WeatherLog.recorded_at).label("recorded_at")
+    ).where(
+        WeatherLog.recorded_at >= cutoff
+    ).group_by(WeatherLog.district).subquery()
+
+    rows = await db.execute(
+        select(WeatherLog.district, WeatherLog.rainfall_mm).join(
+            latest,
+            (WeatherLog.district == latest.c.district)
+            & (WeatherLog.recorded_at == latest.c.recorded_at)
+        )
+    )
+    rainfall_by_district = {
+        district: float(rainfall_mm) if rainfall_mm else 0.0
+        for district, rainfall_mm in rows
+    }
 
-        rainfall = float(latest_log.rainfall_mm) if latest_log and latest_log.rainfall_mm else 0.0
+    districts = district_data["districts"]
+    rainfalls = [rainfall_by_district.get(d["name"], 0.0) for d in districts]
+    levels = get_alert_levels(rainfalls)
 
-        result.append(DistrictInfo(
+    return [
+        DistrictInfo(
             name=district["name"],
             latitude=district["latitude"],
             longitude=district["longitude"],
-            current_alert_level=get_alert_level(rainfall),
+            current_alert_level=level,
             rainfall_24h_mm=rainfall
-        ))
-
-    return result
+        )
+        for district, rainfall, level in zip(districts, rainfalls, levels)
+    ]
 
 
 @router.get("/{district_name}", response_model=DistrictInfo)
-async def get_district(district_name: str, db: Session = Depends(get_db)):
+async def get_district(
+    district_name: str,
+    db: AsyncSession = Depends(get_async_db),
+    now: datetime = Depends(now_utc)
+):
     """Get information for a specific district."""
-    district_data = load_districts()
-    district = next(
-        (d for d in district_data["districts"] if d["name"].lower() == district_name.lower()),
-        None
-    )
+    district = _districts_by_name().get(district_name.lower())
 
     if not district:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=f"District '{district_name}' not found")
 
     # Get latest weather log
-    latest_log = db.query(WeatherLog).filter(
-        WeatherLog.district == district["name"],
-        WeatherLog.recorded_at >= datetime.utcnow() - timedelta(hours=24)
-    ).order_by(WeatherLog.recorded_at.desc()).first()
+    latest_rainfall = await db.scalar(
+        select(WeatherLog.rainfall_mm).where(
+            WeatherLog.district == district["name"],
+            WeatherLog.recorded_at >= request_cutoff_base(now) - timedelta(hours=24)
+        ).order_by(WeatherLog.recorded_at.desc()).limit(1)
+    )
 
-    rainfall = float(latest_log.rainfall_mm) if latest_log and latest_log.rainfall_mm else 0.0
+    rainfall = float(latest_rainfall) if latest_rainfall else 0.0
 
     return DistrictInfo(
         name=district["name"],
@@ -2,20 +2,26 @@
 Intelligence API Router
 Provides automated actionable intelligence for damage control
 """
-from fastapi import APIRouter, Query, BackgroundTasks
+import asyncio
+import calendar
+from collections import Counter
+
+from fastapi import APIRouter, Query, BackgroundTasks, Request, Response
 from typing import Optional
 
+from ..http_cache import make_etag, conditional_response
 from ..services.intel_engine import intel_engine
 from ..services.sos_fetcher import sos_fetcher
-from ..services.river_fetcher import river_fetcher
+from ..services.river_fetcher import river_fetcher, STATION_STATUSES
 from ..services.osm_facilities import (
-    fetch_all_facilities,
+    ensure_facilities_loaded,
+    get_facilities,
     find_nearby_facilities,
     get_nearest_hospital,
     get_facilities_summary,
     refresh_facilities_cache,
 )
-from ..services.weatherapi_alerts import weatherapi_service
+from ..services.weatherapi_alerts import weatherapi_service, ALERT_SEVERITIES
 from ..services.marine_weather import marine_service
 from ..services.traffic_incidents import traffic_service
 from ..services.here_traffic_flow import here_flow_service
@@ -49,22 +55,14 @@ async def get_priorities(
     - Resource scarcity (no food=3, no water=5)
     - Weather escalation (forecast rain >100mm = 15 points)
     """
-    # Run fresh analysis if cache is empty
-    if not intel_engine.get_priorities():
-        await intel_engine.run_analysis()
-
-    reports = intel_engine.get_priorities(limit=200)
-
-    # Apply filters
-    if district:
-        reports = [r for r in reports if r.get("district", "").lower() == district.lower()]
+    # Run analysis if nothing is cached yet (coalesced across requests)
+    await intel_engine.ensure_fresh()
 
-    if urgency:
-        reports = [r for r in reports if r.get("urgency_tier", "").upper() == urgency.upper()]
+    reports = intel_engine.filter_priorities(district=district, urgency=urgency, limit=limit)
 
     return {
-        "count": len(reports[:limit]),
-        "reports": reports[:limit],
+        "count": len(reports),
+        "reports": reports,
     }
 
 
@@ -82,8 +80,7 @@ async def get_clusters(
     - Centroid coordinates for navigation
     - Vulnerability summary
     """
-    if not intel_engine.get_clusters():
-        await intel_engine.run_analysis()
+    await intel_engine.ensure_fresh()
 
     clusters = intel_engine.get_clusters()
 
@@ -100,7 +97,7 @@ async def get_clusters(
 
 
 @router.get("/summary")
-async def get_summary():
+async def get_summary(request: Request, response: Response):
     """
     Get overall intelligence summary.
 
@@ -112,10 +109,14 @@ async def get_summary():
     - Most affected districts ranked by severity
     - Weather risk overlay per district
     """
-    if not intel_engine.get_summary():
-        await intel_engine.run_analysis()
+    await intel_engine.ensure_fresh()
+
+    summary = intel_engine.get_summary()
+    not_modified = conditional_response(request, response, make_etag(summary.get("analyzed_at")))
+    if not_modified:
+        return not_modified
 
-    return intel_engine.get_summary()
+    return summary
 
 
 @router.get("/district/{district}")
@@ -125,8 +126,7 @@ async def get_district_intel(district: str):
 
     Includes all reports, clusters, and summary stats for the district.
     """
-    if not intel_engine.get_priorities():
-        await intel_engine.run_analysis()
+    await intel_engine.ensure_fresh()
 
     return intel_engine.get_district_intel(district)
 
@@ -168,122 +168,9 @@ async def get_recommended_actions():
 
     Returns prioritized list of actions that should be taken.
     """
-    if not intel_engine.get_summary():
-        await intel_engine.run_analysis()
-
-    summary = intel_engine.get_summary()
-    priorities = intel_engine.get_priorities(limit=100)
-    clusters = intel_engine.get_clusters()
-
-    actions = []
-
-    # Action 1: Critical cases needing immediate rescue
-    critical = [p for p in priorities if p.get("urgency_tier") == "CRITICAL"]
-    if critical:
-        actions.append({
-            "priority": 1,
-            "action": "IMMEDIATE_RESCUE",
-            "description": f"Deploy rescue teams to {len(critical)} CRITICAL cases immediately",
-            "targets": [
-                {
-                    "id": c["id"],
-                    "location": c.get("address") or c.get("district"),
-                    "people": c.get("number_of_people"),
-                    "water_level": c.get("water_level"),
-                    "contact": c.get("phone"),
-                }
-                for c in critical[:10]
-            ],
-        })
-
-    # Action 2: Medical emergencies
-    medical = [p for p in priorities if p.get("has_medical_emergency")]
-    if medical:
-        actions.append({
-            "priority": 2,
-            "action": "MEDICAL_RESPONSE",
-            "description": f"Dispatch medical teams to {len(medical)} cases with medical emergencies",
-            "targets": [
-                {
-                    "id": m["id"],
-                    "location": m.get("address") or m.get("district"),
-                    "people": m.get("number_of_people"),
-                    "contact": m.get("phone"),
-                }
-                for m in medical[:10]
-            ],
-        })
-
-    # Action 3: Food and water distribution
-    needs_supplies = summary.get("resource_needs", {})
-    if needs_supplies.get("needs_water", 0) > 0 or needs_supplies.get("needs_food", 0) > 0:
-        # Find districts with most supply needs
-        districts_needing = sorted(
-            summary.get("most_affected_districts", []),
-            key=lambda d: d.get("needs_water", 0) + d.get("needs_food", 0),
-            reverse=True
-        )[:5]
-
-        actions.append({
-            "priority": 3,
-            "action": "SUPPLY_DISTRIBUTION",
-            "description": f"Distribute supplies: {needs_supplies.get('needs_water', 0)} need water, {needs_supplies.get('needs_food', 0)} need food",
-            "targets": [
-                {
-                    "district": d["district"],
-                    "needs_water": d.get("needs_water", 0),
-                    "needs_food": d.get("needs_food", 0),
-                    "total_people": d.get("total_people", 0),
-                }
-                for d in districts_needing
-            ],
-        })
-
-    # Action 4: Cluster-based rescue operations
-    high_urgency_clusters = [c for c in clusters if c.get("avg_urgency", 0) >= 50]
-    if high_urgency_clusters:
-        actions.append({
-            "priority": 4,
-            "action": "CLUSTER_RESCUE",
-            "description": f"Coordinate rescue operations for {len(high_urgency_clusters)} high-urgency clusters",
-            "targets": [
-                {
-                    "cluster_id": c["cluster_id"],
-                    "name": c["name"],
-                    "report_count": c["report_count"],
-                    "total_people": c["total_people"],
-                    "centroid": c["centroid"],
-                    "critical_count": c.get("critical_count", 0),
-                }
-                for c in high_urgency_clusters[:5]
-            ],
-        })
-
-    # Action 5: Weather escalation warnings
-    escalating_districts = [
-        d for d in summary.get("most_affected_districts", [])
-        if d.get("forecast_rain_24h", 0) > 50
-    ]
-    if escalating_districts:
-        actions.append({
-            "priority": 5,
-            "action": "WEATHER_ALERT",
-            "description": f"Issue warnings for {len(escalating_districts)} districts expecting >50mm rain in 24hrs",
-            "targets": [
-                {
-                    "district": d["district"],
-                    "forecast_rain_24h": d.get("forecast_rain_24h", 0),
-                    "current_cases": d.get("count", 0),
-                }
-                for d in escalating_districts
-            ],
-        })
+    await intel_engine.ensure_fresh()
 
-    return {
-        "generated_at": summary.get("analyzed_at"),
-        "total_actions": len(actions),
-        "actions": actions,
-    }
+    return intel_engine.get_actions()
 
 
 # ============================================================
@@ -303,7 +190,8 @@ async def get_all_facilities():
 
     Data is cached for 24 hours and refreshed automatically.
     """
-    facilities = await fetch_all_facilities()
+    await ensure_facilities_loaded()
+    facilities = get_facilities()
     summary = get_facilities_summary()
 
     return {
@@ -312,7 +200,7 @@ async def get_all_facilities():
         "fire_stations": facilities.get("fire_stations", []),
         "shelters": facilities.get("shelters", []),
         "summary": summary,
-        "last_updated": facilities.get("last_updated").isoformat() if facilities.get("last_updated") else None,
+        "last_updated": facilities.get("last_updated"),  # ORJSONResponse serializes datetimes natively
     }
 
 
@@ -335,7 +223,7 @@ async def get_nearby_facilities(
     - Coordinating with nearby police/fire stations
     """
     # Ensure facilities cache is populated
-    await fetch_all_facilities()
+    await ensure_facilities_loaded()
 
     nearby = find_nearby_facilities(
         lat=lat,
@@ -365,7 +253,7 @@ async def get_nearest_hospital_endpoint(
     Quick lookup for emergency medical response.
     """
     # Ensure facilities cache is populated
-    await fetch_all_facilities()
+    await ensure_facilities_loaded()
 
     hospital = get_nearest_hospital(lat, lon)
 
@@ -395,7 +283,7 @@ async def refresh_facilities():
     return {
         "status": "refreshed",
         "summary": summary,
-        "last_updated": facilities.get("last_updated").isoformat() if facilities.get("last_updated") else None,
+        "last_updated": facilities.get("last_updated"),
     }
 
 
@@ -417,26 +305,35 @@ async def get_river_levels():
 
     Data is cached for 5 minutes and sourced from https://floodms.navy.lk
     """
-    if not river_fetcher.is_cache_valid():
-        await river_fetcher.fetch_river_levels()
+    await river_fetcher.ensure_fresh()
 
     stations = river_fetcher.get_cached_data()
 
-    # Calculate summary stats
-    status_counts = {"normal": 0, "alert": 0, "rising": 0, "falling": 0, "unknown": 0}
-    for station in stations:
-        status = station.get("status", "unknown")
-        status_counts[status] = status_counts.get(status, 0) + 1
+    return {
+        "count": len(stations),
+        "summary": river_fetcher.get_cached_summary(),
+        "stations": stations,
+        "stale_since": river_fetcher.stale_since,
+    }
+
+
+@router.get("/rivers/status/{status}")
+async def get_river_levels_by_status(status: str):
+    """
+    Get river gauging stations with a given status
+    (normal, alert, rising, falling or unknown).
+    """
+    await river_fetcher.ensure_fresh()
+
+    stations = river_fetcher.get_by_status(status)
+    if stations is None:
+        return {"error": f"Unknown status: {status}", "valid_statuses": list(STATION_STATUSES)}
 
     return {
+        "status": status.lower(),
         "count": len(stations),
-        "summary": {
-            "normal": status_counts["normal"],
-            "alert": status_counts["alert"],
-            "rising": status_counts["rising"],
-            "falling": status_counts["falling"],
-        },
         "stations": stations,
+        "stale_since": river_fetcher.stale_since,
     }
 
 
@@ -449,20 +346,10 @@ async def refresh_river_levels():
     """
     stations = await river_fetcher.fetch_river_levels()
 
-    status_counts = {"normal": 0, "alert": 0, "rising": 0, "falling": 0, "unknown": 0}
-    for station in stations:
-        status = station.get("status", "unknown")
-        status_counts[status] = status_counts.get(status, 0) + 1
-
     return {
         "status": "refreshed",
         "count": len(stations),
-        "summary": {
-            "normal": status_counts["normal"],
-            "alert": status_counts["alert"],
-            "rising": status_counts["rising"],
-            "falling": status_counts["falling"],
-        },
+        "summary": river_fetcher.get_cached_summary(),
     }
 
 
@@ -483,26 +370,35 @@ async def get_weather_alerts():
 
     Data is cached for 15 minutes.
     """
-    if not weatherapi_service.is_cache_valid():
-        await weatherapi_service.fetch_all_alerts()
+    await weatherapi_service.ensure_fresh()
 
     alerts = weatherapi_service.get_cached_alerts()
 
-    # Group by severity
-    severity_counts = {"Extreme": 0, "Severe": 0, "Moderate": 0, "Minor": 0, "Unknown": 0}
-    for alert in alerts:
-        severity = alert.get("severity", "Unknown")
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
+    return {
+        "count": len(alerts),
+        "summary": weatherapi_service.get_cached_summary(),
+        "alerts": alerts,
+        "stale_since": weatherapi_service.stale_since,
+    }
+
+
+@router.get("/weather-alerts/severity/{severity}")
+async def get_weather_alerts_by_severity(severity: str):
+    """
+    Get WeatherAPI.com alerts with a given severity
+    (extreme, severe, moderate, minor or unknown).
+    """
+    await weatherapi_service.ensure_fresh()
+
+    alerts = weatherapi_service.get_by_severity(severity)
+    if alerts is None:
+        return {"error": f"Unknown severity: {severity}", "valid_severities": [s.lower() for s in ALERT_SEVERITIES]}
 
     return {
+        "severity": severity.lower(),
         "count": len(alerts),
-        "summary": {
-            "extreme": severity_counts.get("Extreme", 0),
-            "severe": severity_counts.get("Severe", 0),
-            "moderate": severity_counts.get("Moderate", 0),
-            "minor": severity_counts.get("Minor", 0),
-        },
         "alerts": alerts,
+        "stale_since": weatherapi_service.stale_since,
     }
 
 
@@ -515,16 +411,10 @@ async def refresh_weather_alerts():
     """
     alerts = await weatherapi_service.fetch_all_alerts()
 
-    severity_counts = {"Extreme": 0, "Severe": 0, "Moderate": 0, "Minor": 0}
-    for alert in alerts:
-        severity = alert.get("severity", "Unknown")
-        if severity in severity_counts:
-            severity_counts[severity] += 1
-
     return {
         "status": "refreshed",
         "count": len(alerts),
-        "summary": severity_counts,
+        "summary": weatherapi_service.get_severity_counts(),
     }
 
 
@@ -562,8 +452,7 @@ async def get_marine_conditions():
 
     Data is cached for 30 minutes from Open-Meteo Marine API.
     """
-    if not marine_service.is_cache_valid():
-        await marine_service.fetch_all_coastal_data()
+    await marine_service.ensure_fresh()
 
     conditions = marine_service.get_cached_data()
     summary = marine_service.get_summary()
@@ -572,6 +461,7 @@ async def get_marine_conditions():
         "count": len(conditions),
         "summary": summary,
         "conditions": conditions,
+        "stale_since": marine_service.stale_since,
     }
 
 
@@ -599,17 +489,13 @@ async def get_marine_for_district(district: str):
 
     Returns wave height, risk level, and risk factors.
     """
-    if not marine_service.is_cache_valid():
-        await marine_service.fetch_all_coastal_data()
-
-    conditions = marine_service.get_cached_data()
+    await marine_service.ensure_fresh()
 
-    # Find matching district
-    for cond in conditions:
-        if cond.get("district", "").lower() == district.lower():
-            return cond
+    cond = marine_service.get_by_district(district)
+    if cond:
+        return cond
 
-    return {"error": f"No marine data for district: {district}", "available_districts": list(set(c["district"] for c in conditions))}
+    return {"error": f"No marine data for district: {district}", "available_districts": list(marine_service.district_names)}
 
 
 # ============================================================
@@ -635,8 +521,7 @@ async def get_traffic_incidents(
 
     Data is cached for 5 minutes and sourced from TomTom Traffic API.
     """
-    if not traffic_service.is_cache_valid():
-        await traffic_service.fetch_incidents()
+    await traffic_service.ensure_fresh()
 
     if category:
         incidents = traffic_service.get_by_category(category)
@@ -692,19 +577,11 @@ async def get_traffic_flow():
 
     Data is cached for 5 minutes.
     """
-    # Fetch from both sources
-    here_data = []
-    tomtom_data = []
+    # Fetch from both sources concurrently
+    await asyncio.gather(here_flow_service.ensure_fresh(), tomtom_flow_service.ensure_fresh())
 
-    if not here_flow_service.is_cache_valid():
-        here_data = await here_flow_service.fetch_all_flow_data()
-    else:
-        here_data = here_flow_service.get_cached_data()
-
-    if not tomtom_flow_service.is_cache_valid():
-        tomtom_data = await tomtom_flow_service.fetch_all_flow_data()
-    else:
-        tomtom_data = tomtom_flow_service.get_cached_data()
+    here_data = here_flow_service.get_cached_data()
+    tomtom_data = tomtom_flow_service.get_cached_data()
 
     here_summary = here_flow_service.get_summary()
     tomtom_summary = tomtom_flow_service.get_summary()
@@ -731,8 +608,7 @@ async def get_here_traffic_flow():
 
     Returns speeds and congestion for major Sri Lanka roads.
     """
-    if not here_flow_service.is_cache_valid():
-        await here_flow_service.fetch_all_flow_data()
+    await here_flow_service.ensure_fresh()
 
     data = here_flow_service.get_cached_data()
     summary = here_flow_service.get_summary()
@@ -751,8 +627,7 @@ async def get_tomtom_traffic_flow():
 
     Returns speeds, travel times, and delays for major Sri Lanka roads.
     """
-    if not tomtom_flow_service.is_cache_valid():
-        await tomtom_flow_service.fetch_all_flow_data()
+    await tomtom_flow_service.ensure_fresh()
 
     data = tomtom_flow_service.get_cached_data()
     summary = tomtom_flow_service.get_summary()
@@ -796,8 +671,7 @@ async def get_here_weather():
 
     Data is cached for 30 minutes.
     """
-    if not here_weather_service.is_cache_valid():
-        await here_weather_service.fetch_all_observations()
+    await here_weather_service.ensure_fresh()
 
     observations = here_weather_service.get_cached_observations()
     summary = here_weather_service.get_summary()
@@ -901,8 +775,7 @@ async def get_irrigation_water_levels():
     Data sourced from Irrigation Department's ArcGIS service.
     Cached for 5 minutes.
     """
-    if not irrigation_fetcher.is_cache_valid():
-        await irrigation_fetcher.fetch_water_levels()
+    await irrigation_fetcher.ensure_fresh()
 
     stations = irrigation_fetcher.get_cached_data()
     summary = irrigation_fetcher.get_summary()
@@ -922,8 +795,7 @@ async def get_irrigation_by_district(district: str):
     Returns flood risk assessment for the district based on
     river water levels at upstream stations.
     """
-    if not irrigation_fetcher.is_cache_valid():
-        await irrigation_fetcher.fetch_water_levels()
+    await irrigation_fetcher.ensure_fresh()
 
     return irrigation_fetcher.get_flood_risk_for_district(district)
 
@@ -965,11 +837,11 @@ async def get_flood_threat_assessment():
     - Top risk districts
     - Contributing factors
     """
-    # Ensure data is fresh
+    # Ensure data is fresh (independent upstreams, refreshed concurrently)
+    refreshes = [irrigation_fetcher.ensure_fresh()]
     if not weather_cache.is_cache_valid():
-        await weather_cache.refresh_cache()
-    if not irrigation_fetcher.is_cache_valid():
-        await irrigation_fetcher.fetch_water_levels()
+        refreshes.append(weather_cache.refresh_cache())
+    await asyncio.gather(*refreshes)
 
     weather_data = weather_cache.get_all_weather(hours=24)
     forecast_data = weather_cache.get_all_forecast()
@@ -1258,20 +1130,15 @@ async def get_extreme_events(
     coords = DISTRICT_COORDS[district]
 
     # Fetch and analyze
-    rainfall_data = await flood_analyzer.fetch_historical_rainfall(
+    rainfall = await flood_analyzer.fetch_historical_rainfall(
         coords["lat"], coords["lon"],
         start_year=1994, end_year=2024
     )
 
-    extreme_events = flood_analyzer.analyze_extreme_events(rainfall_data, threshold_mm)
+    extreme_events = flood_analyzer.analyze_extreme_events(rainfall, threshold_mm)
 
     # Group by month to see which months have most extreme events
-    month_counts = {}
-    for event in extreme_events:
-        month = event["month"]
-        month_name = ["", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
-                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"][month]
-        month_counts[month_name] = month_counts.get(month_name, 0) + 1
+    month_counts = dict(Counter(calendar.month_abbr[event["month"]] for event in extreme_events))
 
     return {
         "district": district,
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 import logging
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import Subscriber
 from ..schemas import SubscriberCreate, SubscriberResponse, UnsubscribeRequest
 from ..services.whatsapp_service import whatsapp_service
@@ -13,44 +14,95 @@ router = APIRouter(prefix="/api", tags=["subscribers"])
 logger = logging.getLogger(__name__)
 
 # 25 main districts of Sri Lanka
-VALID_DISTRICTS = {
+VALID_DISTRICTS = frozenset({
     "Colombo", "Gampaha", "Kalutara", "Kandy", "Matale", "Nuwara Eliya",
     "Galle", "Matara", "Hambantota", "Jaffna", "Kilinochchi", "Mannar",
     "Vavuniya", "Mullaitivu", "Batticaloa", "Ampara", "Trincomalee",
     "Kurunegala", "Puttalam", "Anuradhapura", "Polonnaruwa", "Badulla",
     "Monaragala", "Ratnapura", "Kegalle"
+})
+_SORTED_DISTRICTS_STR = ", ".join(sorted(VALID_DISTRICTS))
+
+# WhatsApp subscription confirmation, keyed by subscriber language
+CONFIRMATION_TEMPLATES = {
+    "si": (
+        "*FloodWatch Sri Lanka වෙත සාදරයෙන් පිළිගනිමු!*\n\n"
+        "ඔබ පහත දිස්ත්‍රික්ක සඳහා ජල ආපදා අනතුරු ඇඟවීම් ලබා ගැනීමට ලියාපදිංචි වී ඇත:\n"
+        "{districts}\n\n"
+        "Reply *unsubscribe* to stop alerts.\n"
+        "Reply *status* to check your subscription.\n\n"
+        "frontend-iklxt07wf-thaaarus-projects.vercel.app වෙත පිවිසෙන්න"
+    ),
+    "ta": (
+        "*FloodWatch Sri Lanka க்கு வரவேற்கிறோம்!*\n\n"
+        "நீங்கள் பின்வரும் மாவட்டங்களுக்கு வெள்ள எச்சரிக்கைகளைப் பெற பதிவு செய்துள்ளீர்கள்:\n"
+        "{districts}\n\n"
+        "Reply *unsubscribe* to stop alerts.\n"
+        "Reply *status* to check your subscription.\n\n"
+        "frontend-iklxt07wf-thaaarus-projects.vercel.app ஐ பார்வையிடவும்"
+    ),
+    "en": (
+        "*Welcome to FloodWatch Sri Lanka!*\n\n"
+        "You are now subscribed to flood alerts for:\n"
+        "{districts}\n\n"
+        "Reply *unsubscribe* to stop alerts.\n"
+        "Reply *status* to check your subscription.\n\n"
+        "Visit frontend-iklxt07wf-thaaarus-projects.vercel.app for the full map"
+    ),
 }
 
+# Strips "+" and spaces from phone numbers for the WhatsApp API
+_PHONE_STRIP = str.maketrans("", "", "+ ")
+
+
+def _validate_districts(districts: list[str]):
+    """Reject any district outside VALID_DISTRICTS with a 400."""
+    invalid = set(districts) - VALID_DISTRICTS
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid districts: {', '.join(sorted(invalid))}. Valid districts: {_SORTED_DISTRICTS_STR}"
+        )
+
 
 @router.post("/subscribe", response_model=SubscriberResponse)
-async def subscribe(request: SubscriberCreate, db: Session = Depends(get_db)):
+async def subscribe(
+    request: SubscriberCreate,
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Subscribe a phone number to flood alerts."""
-    # Validate districts
-    for district in request.districts:
-        if district not in VALID_DISTRICTS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid district: {district}. Valid districts: {', '.join(sorted(VALID_DISTRICTS))}"
-            )
-
-    # Check if already subscribed
-    existing = db.query(Subscriber).filter(
-        Subscriber.phone_number == request.phone_number
-    ).first()
+    _validate_districts(request.districts)
+
+    # Check if already subscribed (column probe on the unique phone_number index)
+    existing = (await db.execute(
+        select(Subscriber.id, Subscriber.active, Subscriber.created_at)
+        .where(Subscriber.phone_number == request.phone_number)
+    )).first()
 
     if existing:
         if existing.active:
             raise HTTPException(status_code=400, detail="Phone number already subscribed")
-        # Reactivate subscription
-        existing.active = True
-        existing.districts = request.districts
-        existing.language = request.language
-        db.commit()
-        db.refresh(existing)
+        # Reactivate subscription in place, without loading the row
+        await db.execute(
+            update(Subscriber)
+            .where(Subscriber.id == existing.id)
+            .values(active=True, districts=request.districts, language=request.language)
+        )
+        await db.commit()
         logger.info(f"Reactivated subscription for {request.phone_number}")
-        # Send confirmation for reactivated subscription
-        await _send_subscription_confirmation(request.phone_number, request.districts, request.language)
-        return existing
+        # Send confirmation for reactivated subscription after the response
+        background.add_task(
+            _send_subscription_confirmation, request.phone_number, request.districts, request.language
+        )
+        return SubscriberResponse(
+            id=existing.id,
+            phone_number=request.phone_number,
+            districts=request.districts,
+            language=request.language,
+            active=True,
+            created_at=existing.created_at,
+        )
 
     # Create new subscriber
     subscriber = Subscriber(
@@ -59,13 +111,15 @@ async def subscribe(request: SubscriberCreate, db: Session = Depends(get_db)):
         language=request.language
     )
     db.add(subscriber)
-    db.commit()
-    db.refresh(subscriber)
+    await db.commit()
+    await db.refresh(subscriber)
 
     logger.info(f"New subscription created for {request.phone_number}")
 
-    # Send WhatsApp confirmation message
-    await _send_subscription_confirmation(request.phone_number, request.districts, request.language)
+    # Send WhatsApp confirmation message after the response is sent
+    background.add_task(
+        _send_subscription_confirmation, request.phone_number, request.districts, request.language
+    )
 
     return subscriber
 
@@ -76,36 +130,10 @@ async def _send_subscription_confirmation(phone: str, districts: list[str], lang
         logger.warning("WhatsApp not configured - confirmation not sent")
         return
 
-    # Build message based on language
-    if language == "si":
-        message = (
-            f"*FloodWatch Sri Lanka වෙත සාදරයෙන් පිළිගනිමු!*\n\n"
-            f"ඔබ පහත දිස්ත්‍රික්ක සඳහා ජල ආපදා අනතුරු ඇඟවීම් ලබා ගැනීමට ලියාපදිංචි වී ඇත:\n"
-            f"{', '.join(districts)}\n\n"
-            f"Reply *unsubscribe* to stop alerts.\n"
-            f"Reply *status* to check your subscription.\n\n"
-            f"frontend-iklxt07wf-thaaarus-projects.vercel.app වෙත පිවිසෙන්න"
-        )
-    elif language == "ta":
-        message = (
-            f"*FloodWatch Sri Lanka க்கு வரவேற்கிறோம்!*\n\n"
-            f"நீங்கள் பின்வரும் மாவட்டங்களுக்கு வெள்ள எச்சரிக்கைகளைப் பெற பதிவு செய்துள்ளீர்கள்:\n"
-            f"{', '.join(districts)}\n\n"
-            f"Reply *unsubscribe* to stop alerts.\n"
-            f"Reply *status* to check your subscription.\n\n"
-            f"frontend-iklxt07wf-thaaarus-projects.vercel.app ஐ பார்வையிடவும்"
-        )
-    else:
-        message = (
-            f"*Welcome to FloodWatch Sri Lanka!*\n\n"
-            f"You are now subscribed to flood alerts for:\n"
-            f"{', '.join(districts)}\n\n"
-            f"Reply *unsubscribe* to stop alerts.\n"
-            f"Reply *status* to check your subscription.\n\n"
-            f"Visit frontend-iklxt07wf-thaaarus-projects.vercel.app for the full map"
-        )
+    template = CONFIRMATION_TEMPLATES.get(language, CONFIRMATION_TEMPLATES["en"])
+    message = template.format(districts=", ".join(districts))
 
-    phone_clean = phone.replace("+", "").replace(" ", "")
+    phone_clean = phone.translate(_PHONE_STRIP)
     result = await whatsapp_service.send_text_message(phone_clean, message)
     if result.get("success"):
         logger.info(f"Confirmation message sent to {phone}")
@@ -114,17 +142,18 @@ async def _send_subscription_confirmation(phone: str, districts: list[str], lang
 
 
 @router.post("/unsubscribe")
-async def unsubscribe(request: UnsubscribeRequest, db: Session = Depends(get_db)):
+async def unsubscribe(request: UnsubscribeRequest, db: AsyncSession = Depends(get_async_db)):
     """Unsubscribe a phone number from flood alerts."""
-    subscriber = db.query(Subscriber).filter(
-        Subscriber.phone_number == request.phone_number
-    ).first()
+    result = await db.execute(
+        update(Subscriber)
+        .where(Subscriber.phone_number == request.phone_number)
+        .values(active=False)
+    )
 
-    if not subscriber:
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Phone number not found")
 
-    subscriber.active = False
-    db.commit()
+    await db.commit()
 
     logger.info(f"Unsubscribed {request.phone_number}")
 
@@ -132,11 +161,11 @@ async def unsubscribe(request: UnsubscribeRequest, db: Session = Depends(get_db)
 
 
 @router.get("/subscribers/{phone_number}", response_model=SubscriberResponse)
-async def get_subscriber(phone_number: str, db: Session = Depends(get_db)):
+async def get_subscriber(phone_number: str, db: AsyncSession = Depends(get_async_db)):
     """Get subscriber details by phone number."""
-    subscriber = db.query(Subscriber).filter(
-        Subscriber.phone_number == phone_number
-    ).first()
+    subscriber = await db.scalar(
+        select(Subscriber).where(Subscriber.phone_number == phone_number)
+    )
 
     if not subscriber:
         raise HTTPException(status_code=404, detail="Subscriber not found")
@@ -148,27 +177,21 @@ async def get_subscriber(phone_number: str, db: Session = Depends(get_db)):
 async def update_subscriber(
     phone_number: str,
     request: SubscriberCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update subscriber preferences."""
-    subscriber = db.query(Subscriber).filter(
-        Subscriber.phone_number == phone_number
-    ).first()
+    subscriber = await db.scalar(
+        select(Subscriber).where(Subscriber.phone_number == phone_number)
+    )
 
     if not subscriber:
         raise HTTPException(status_code=404, detail="Subscriber not found")
 
-    # Validate districts
-    for district in request.districts:
-        if district not in VALID_DISTRICTS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid district: {district}. Valid districts: {', '.join(sorted(VALID_DISTRICTS))}"
-            )
+    _validate_districts(request.districts)
 
     subscriber.districts = request.districts
     subscriber.language = request.language
-    db.commit()
-    db.refresh(subscriber)
+    await db.commit()
+    await db.refresh(subscriber)
 
     return subscriber
@@ -1,83 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime, timedelta, date
-import json
-import os
-import asyncio
-
-from ..database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from bisect import bisect_right
+
+from ..database import get_async_db
 from ..models import WeatherLog
 from ..schemas import WeatherResponse, WeatherSummary
-from ..services.districts_service import get_district_by_name, get_all_districts
+from ..services.districts_service import get_district_by_name
 from ..services.open_meteo import OpenMeteoService
 from ..services.weather_cache import weather_cache
+from ..services.weather_log_buffer import queue_weather_log, flush_weather_logs
+from ..services import yesterday_stats
 from ..config import get_settings
+from ..http_cache import make_etag, conditional_response
 
 router = APIRouter(prefix="/api/weather", tags=["weather"])
 
-# Cache file for yesterday's stats - persists across restarts
-YESTERDAY_STATS_CACHE_FILE = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), "cache", "yesterday_stats.json"
-)
+# Browser/CDN caching for the all-district payloads; clients revalidate via ETag
+WEATHER_MAX_AGE_SECONDS = 30
+WEATHER_STALE_WHILE_REVALIDATE_SECONDS = 1800
 
-# Lock to prevent concurrent fetches of yesterday stats
-_yesterday_stats_lock = asyncio.Lock()
+# X-Cache header value for each weather cache state
+X_CACHE_STATUS = {"fresh": "HIT", "stale": "STALE", "expired": "EXPIRED", "empty": "MISS"}
 
 settings = get_settings()
 weather_service = OpenMeteoService()  # Keep for individual district requests
 
 
+ALERT_LEVELS = ("green", "yellow", "orange", "red")
+
+
+def _scaled_thresholds(hours: int) -> tuple[float, float, float]:
+    """Ascending yellow/orange/red thresholds scaled to the period (24h is base)."""
+    scale = hours / 24
+    return (
+        settings.threshold_yellow * scale,
+        settings.threshold_orange * scale,
+        settings.threshold_red * scale,
+    )
+
+
+# Thresholds for the supported rainfall periods, computed once at import
+ALERT_THRESHOLDS_BY_HOURS = {hours: _scaled_thresholds(hours) for hours in (24, 48, 72)}
+
+
 def get_alert_level(rainfall_mm: float, hours: int = 24) -> str:
     """Determine alert level based on rainfall. Thresholds scale with time period."""
-    # Scale thresholds based on hours (24h is base)
-    scale = hours / 24
-    if rainfall_mm >= settings.threshold_red * scale:
-        return "red"
-    elif rainfall_mm >= settings.threshold_orange * scale:
-        return "orange"
-    elif rainfall_mm >= settings.threshold_yellow * scale:
-        return "yellow"
-    return "green"
+    thresholds = ALERT_THRESHOLDS_BY_HOURS.get(hours) or _scaled_thresholds(hours)
+    return ALERT_LEVELS[bisect_right(thresholds, rainfall_mm)]
 
 
 @router.get("/all")
 async def get_all_weather(
+    request: Request,
     hours: int = Query(24, description="Rainfall period: 24, 48, or 72 hours"),
-    db: Session = Depends(get_db)
 ):
     """
     Get weather summary for all districts. Used by the dashboard map.
     Data is cached and refreshed every 30 minutes to avoid API rate limits.
     Returns stale data immediately if available, triggers background refresh.
+    The X-Cache header reports HIT, STALE, EXPIRED or MISS.
     """
-    import asyncio
-
     if hours not in [24, 48, 72]:
         hours = 24
 
-    # Check if we have any cached data (even if stale)
-    cached_data = weather_cache.get_all_weather(hours)
+    state = weather_cache.cache_state()
+
+    if state in ("stale", "expired"):
+        # Serve what we have immediately (flagged via X-Cache), refresh in background
+        weather_cache.refresh_in_background()
+    elif state == "empty":
+        # No cached data at all - must wait for refresh
+        try:
+            refreshed = await weather_cache.refresh_cache()
+        except Exception as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Weather service unavailable and no cached data: {str(e)}"
+            )
+        if not refreshed:
+            raise HTTPException(
+                status_code=503,
+                detail="Weather service unavailable and no cached data"
+            )
 
-    # If cache is invalid, trigger background refresh (don't wait)
-    if not weather_cache.is_cache_valid():
-        if cached_data:
-            # Have stale data - return it immediately, refresh in background
-            asyncio.create_task(weather_cache.refresh_cache())
-            return cached_data
-        else:
-            # No cached data at all - must wait for refresh
-            try:
-                await weather_cache.refresh_cache()
-                return weather_cache.get_all_weather(hours)
-            except Exception as e:
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Weather service unavailable and no cached data: {str(e)}"
-                )
-
-    # Return fresh cached data
-    return cached_data
+    # Payload is serialized once per cache update and reused across hits
+    response = Response(
+        content=weather_cache.get_all_weather_bytes(hours),
+        media_type="application/json",
+        headers={"X-Cache": X_CACHE_STATUS[state]},
+    )
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag("weather-all", hours, weather_cache.last_update),
+        max_age=WEATHER_MAX_AGE_SECONDS,
+        stale_while_revalidate=WEATHER_STALE_WHILE_REVALIDATE_SECONDS,
+        last_modified=weather_cache.last_update,
+    )
+    return not_modified or response
 
 
 @router.get("/cache-status")
@@ -97,7 +119,7 @@ async def refresh_cache():
 
 
 @router.get("/{district_name}", response_model=WeatherResponse)
-async def get_district_weather(district_name: str, db: Session = Depends(get_db)):
+async def get_district_weather(district_name: str, background_tasks: BackgroundTasks):
     """Get detailed weather data for a specific district."""
     district = get_district_by_name(district_name)
 
@@ -128,15 +150,15 @@ async def get_district_weather(district_name: str, db: Session = Depends(get_db)
             district["longitude"]
         )
 
-        # Log weather data
-        log = WeatherLog(
+        # Queue weather log row; written in bulk by the scheduler, or after
+        # the response is sent once the buffer fills
+        if queue_weather_log(
             district=district["name"],
             rainfall_mm=weather_data.get("rainfall_24h_mm", 0.0),
             temperature_c=weather_data.get("temperature_c"),
             humidity_percent=weather_data.get("humidity_percent")
-        )
-        db.add(log)
-        db.commit()
+        ):
+            background_tasks.add_task(flush_weather_logs)
 
         rainfall_24h = weather_data.get("rainfall_24h_mm", 0.0)
 
@@ -157,9 +179,7 @@ async def get_district_weather(district_name: str, db: Session = Depends(get_db)
 
 
 @router.get("/forecast/all")
-async def get_all_forecast(
-    db: Session = Depends(get_db)
-):
+async def get_all_forecast(request: Request, response: Response):
     """
     Get 5-day forecast for all districts.
     Data is extracted from the cached weather data.
@@ -167,32 +187,18 @@ async def get_all_forecast(
     if not weather_cache.is_cache_valid():
         await weather_cache.refresh_cache()
 
-    return weather_cache.get_all_forecast()
-
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag("forecast-all", weather_cache.last_update),
+        max_age=WEATHER_MAX_AGE_SECONDS,
+        stale_while_revalidate=WEATHER_STALE_WHILE_REVALIDATE_SECONDS,
+        last_modified=weather_cache.last_update,
+    )
+    if not_modified:
+        return not_modified
 
-def _load_yesterday_stats_cache():
-    """Load cached yesterday stats if valid for today."""
-    try:
-        if os.path.exists(YESTERDAY_STATS_CACHE_FILE):
-            with open(YESTERDAY_STATS_CACHE_FILE, "r") as f:
-                cached = json.load(f)
-            # Check if cache is for yesterday's date
-            yesterday_str = (date.today() - timedelta(days=1)).isoformat()
-            if cached.get("date") == yesterday_str:
-                return cached
-    except Exception:
-        pass
-    return None
-
-
-def _save_yesterday_stats_cache(stats: dict):
-    """Save yesterday stats to cache file."""
-    try:
-        os.makedirs(os.path.dirname(YESTERDAY_STATS_CACHE_FILE), exist_ok=True)
-        with open(YESTERDAY_STATS_CACHE_FILE, "w") as f:
-            json.dump(stats, f)
-    except Exception:
-        pass
+    return weather_cache.get_all_forecast()
 
 
 @router.get("/yesterday/stats")
@@ -200,156 +206,18 @@ async def get_yesterday_stats():
     """
     Get yesterday's weather statistics for all districts.
     Uses Open-Meteo historical API to fetch data from yesterday.
-    Results are cached for the entire day since yesterday's data won't change.
+    Results are cached for the entire day since yesterday's data won't change,
+    and are prefetched by the scheduler shortly after midnight.
     Returns summary with total rainfall, districts with rain, max rainfall, etc.
-    Uses async lock to prevent concurrent fetches from multiple users.
     """
-    import httpx
-
-    # Check cache first (without lock) - yesterday's data doesn't change
-    cached_stats = _load_yesterday_stats_cache()
-    if cached_stats:
-        return cached_stats
-
-    # Use lock to prevent concurrent API fetches
-    async with _yesterday_stats_lock:
-        # Double-check cache after acquiring lock (another request might have filled it)
-        cached_stats = _load_yesterday_stats_cache()
-        if cached_stats:
-            return cached_stats
-
-        yesterday = date.today() - timedelta(days=1)
-        yesterday_str = yesterday.isoformat()
-
-        districts = get_all_districts()
-
-        stats = {
-            "date": yesterday_str,
-            "total_districts": len(districts),
-            "districts_with_rain": 0,
-            "total_rainfall_mm": 0.0,
-            "avg_rainfall_mm": 0.0,
-            "max_rainfall_mm": 0.0,
-            "max_rainfall_district": None,
-            "heavy_rain_districts": [],  # >50mm
-            "moderate_rain_districts": [],  # 25-50mm
-            "light_rain_districts": [],  # >0 and <25mm
-            "dry_districts": [],  # 0mm
-            "district_data": []
-        }
-
-        async def fetch_district_data(client: httpx.AsyncClient, district: dict):
-            """Fetch weather data for a single district."""
-            try:
-                # Use forecast API with past_days for better recent data coverage
-                params = {
-                    "latitude": district["latitude"],
-                    "longitude": district["longitude"],
-                    "past_days": 1,  # Get yesterday's data
-                    "daily": "precipitation_sum,rain_sum,temperature_2m_max,temperature_2m_min",
-                    "timezone": "Asia/Colombo"
-                }
-
-                resp = await client.get(
-                    "https://api.open-meteo.com/v1/forecast",
-                    params=params,
-                    timeout=30.0  # Per-request timeout
-                )
-
-                if resp.status_code == 200:
-                    data = resp.json()
-                    daily = data.get("daily", {})
-                    if daily and len(daily.get("precipitation_sum", [])) > 0:
-                        precip = daily.get("precipitation_sum", [0])[0] or 0
-                        rain = daily.get("rain_sum", [0])[0] or 0
-                        rainfall = max(precip, rain)
-                        temp_max = daily.get("temperature_2m_max", [None])[0]
-                        temp_min = daily.get("temperature_2m_min", [None])[0]
-
-                        return {
-                            "district": district["name"],
-                            "rainfall_mm": round(rainfall, 1),
-                            "temp_max_c": round(temp_max, 1) if temp_max else None,
-                            "temp_min_c": round(temp_min, 1) if temp_min else None
-                        }
-            except Exception as e:
-                # Silently fail but log to console for debugging
-                print(f"Failed to fetch data for {district.get('name', 'unknown')}: {str(e)[:50]}")
-            return None
-
-        # Fetch all districts in batches to avoid rate limiting
-        batch_size = 25  # Process 25 districts at a time
-        results = []
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            for i in range(0, len(districts), batch_size):
-                batch = districts[i:i + batch_size]
-                tasks = [fetch_district_data(client, d) for d in batch]
-                batch_results = await asyncio.gather(*tasks)
-                results.extend(batch_results)
-                # Small delay between batches to avoid rate limiting
-                if i + batch_size < len(districts):
-                    await asyncio.sleep(0.5)
-
-        # Process results
-        for district_info in results:
-            if district_info is None:
-                continue
-
-            stats["district_data"].append(district_info)
-            rainfall = district_info["rainfall_mm"]
-
-            stats["total_rainfall_mm"] += rainfall
-
-            if rainfall > 0:
-                stats["districts_with_rain"] += 1
-
-            if rainfall > stats["max_rainfall_mm"]:
-                stats["max_rainfall_mm"] = rainfall
-                stats["max_rainfall_district"] = district_info["district"]
-
-            if rainfall >= 50:
-                stats["heavy_rain_districts"].append({
-                    "district": district_info["district"],
-                    "rainfall_mm": rainfall
-                })
-            elif rainfall >= 25:
-                stats["moderate_rain_districts"].append({
-                    "district": district_info["district"],
-                    "rainfall_mm": rainfall
-                })
-            elif rainfall > 0:
-                stats["light_rain_districts"].append({
-                    "district": district_info["district"],
-                    "rainfall_mm": rainfall
-                })
-            else:
-                stats["dry_districts"].append(district_info["district"])
-
-        # Calculate averages
-        if stats["district_data"]:
-            stats["avg_rainfall_mm"] = round(
-                stats["total_rainfall_mm"] / len(stats["district_data"]), 1
-            )
-
-        stats["total_rainfall_mm"] = round(stats["total_rainfall_mm"], 1)
-        stats["max_rainfall_mm"] = round(stats["max_rainfall_mm"], 1)
-
-        # Sort district data by rainfall (descending)
-        stats["district_data"].sort(key=lambda x: x["rainfall_mm"], reverse=True)
-        stats["heavy_rain_districts"].sort(key=lambda x: x["rainfall_mm"], reverse=True)
-        stats["moderate_rain_districts"].sort(key=lambda x: x["rainfall_mm"], reverse=True)
-
-        # Cache the results for the rest of the day
-        _save_yesterday_stats_cache(stats)
-
-        return stats
+    return await yesterday_stats.get_yesterday_stats()
 
 
 @router.get("/{district_name}/history")
 async def get_weather_history(
     district_name: str,
     days: int = Query(7, le=30),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get historical weather data for a district."""
     district = get_district_by_name(district_name)
@@ -359,21 +227,27 @@ async def get_weather_history(
 
     cutoff = datetime.utcnow() - timedelta(days=days)
 
-    logs = db.query(WeatherLog).filter(
-        WeatherLog.district == district["name"],
-        WeatherLog.recorded_at >= cutoff
-    ).order_by(WeatherLog.recorded_at.asc()).all()
+    # DECIMAL columns are cast to float in SQL so rows map straight onto the response
+    result = await db.execute(
+        select(
+            func.coalesce(cast(WeatherLog.rainfall_mm, Float), 0.0).label("rainfall_mm"),
+            cast(WeatherLog.temperature_c, Float).label("temperature_c"),
+            WeatherLog.humidity_percent,
+            WeatherLog.recorded_at,
+        ).where(
+            WeatherLog.district == district["name"],
+            WeatherLog.recorded_at >= cutoff
+        ).order_by(WeatherLog.recorded_at)
+    )
+
+    # Keep the latest reading in each hour, so the whole window is covered
+    # at a bounded size however often logs were written
+    buckets = {}
+    for row in result.mappings():
+        buckets[row["recorded_at"].replace(minute=0, second=0, microsecond=0)] = row
 
     return {
         "district": district["name"],
         "period_days": days,
-        "data": [
-            {
-                "rainfall_mm": float(log.rainfall_mm) if log.rainfall_mm else 0.0,
-                "temperature_c": float(log.temperature_c) if log.temperature_c else None,
-                "humidity_percent": log.humidity_percent,
-                "recorded_at": log.recorded_at.isoformat()
-            }
-            for log in logs
-        ]
+        "data": [dict(row) for row in buckets.values()]
     }
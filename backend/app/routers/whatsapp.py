@@ -6,12 +6,13 @@ from fastapi import APIRouter, Query, Request, HTTPException, Depends, Form
 from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import Optional
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 import logging
 
 from ..config import get_settings
 from ..database import get_db
-from ..models import Subscriber
+from ..models import Subscriber, subscribed_to_district, upsert_subscriber
 from ..services.whatsapp_service import whatsapp_service
 
 logger = logging.getLogger(__name__)
@@ -19,6 +20,48 @@ settings = get_settings()
 
 router = APIRouter(prefix="/api/whatsapp", tags=["whatsapp"])
 
+# Characters dropped when normalizing phone numbers
+_PHONE_STRIP = str.maketrans("", "", "+ -")
+
+VALID_DISTRICTS = frozenset({
+    "Colombo", "Gampaha", "Kalutara", "Kandy", "Matale", "Nuwara Eliya",
+    "Galle", "Matara", "Hambantota", "Jaffna", "Kilinochchi", "Mannar",
+    "Vavuniya", "Mullaitivu", "Batticaloa", "Ampara", "Trincomalee",
+    "Kurunegala", "Puttalam", "Anuradhapura", "Polonnaruwa", "Badulla",
+    "Monaragala", "Ratnapura", "Kegalle"
+})
+
+# Fixed bot replies, built once at import
+SUBSCRIBE_USAGE_MESSAGE = (
+    "Please specify districts to subscribe to.\n\n"
+    "Example: *subscribe Colombo, Gampaha*\n\n"
+    "Available districts: Colombo, Gampaha, Kalutara, Kandy, Matale, "
+    "Nuwara Eliya, Galle, Matara, Hambantota, Jaffna, Kilinochchi, "
+    "Mannar, Vavuniya, Mullaitivu, Batticaloa, Ampara, Trincomalee, "
+    "Kurunegala, Puttalam, Anuradhapura, Polonnaruwa, Badulla, "
+    "Monaragala, Ratnapura, Kegalle"
+)
+
+HELP_MESSAGE = (
+    "*FloodWatch Sri Lanka*\n\n"
+    "Get real-time flood alerts for your district.\n\n"
+    "*Commands:*\n"
+    "- *subscribe [districts]* - Subscribe to alerts\n"
+    "  Example: subscribe Colombo, Gampaha\n\n"
+    "- *unsubscribe* - Stop receiving alerts\n\n"
+    "- *status* - Check your subscription\n\n"
+    "- *help* - Show this message\n\n"
+    "Visit frontend-iklxt07wf-thaaarus-projects.vercel.app for the full map"
+)
+
+WELCOME_MESSAGE = (
+    "Welcome to *FloodWatch Sri Lanka*!\n\n"
+    "I can help you stay informed about flood conditions in your area.\n\n"
+    "To get started, subscribe to alerts for your district:\n"
+    "*subscribe Colombo*\n\n"
+    "Or reply *help* for more options."
+)
+
 
 # Request/Response models
 class WhatsAppSubscribeRequest(BaseModel):
@@ -68,7 +111,7 @@ async def handle_twilio_webhook(
         logger.info(f"WhatsApp webhook received: From={from_phone}, Body={body[:50]}, SID={message_sid}")
 
         # Extract phone number (remove whatsapp: prefix)
-        phone = from_phone.replace("whatsapp:", "").replace("+", "").strip()
+        phone = from_phone.removeprefix("whatsapp:").translate(_PHONE_STRIP).strip()
         text = body.strip().lower()
 
         if not phone or not text:
@@ -103,21 +146,17 @@ async def process_command(phone: str, text: str, db: Session) -> str:
     """Process user command and return response"""
 
     # Normalize phone (ensure it doesn't have extra characters)
-    phone = phone.replace("+", "").replace(" ", "").replace("-", "")
+    phone = phone.translate(_PHONE_STRIP)
 
     if text.startswith("subscribe"):
         return await handle_subscribe(phone, text, db)
-    elif text == "unsubscribe" or text == "stop":
-        return await handle_unsubscribe(phone, db)
-    elif text == "status":
-        return await handle_status(phone, db)
-    elif text == "help" or text == "?":
-        return get_help_message()
-    elif text == "hi" or text == "hello":
-        return get_welcome_message()
-    else:
-        # Default: show help
-        return get_help_message()
+
+    handler = COMMAND_HANDLERS.get(text)
+    if handler:
+        return await handler(phone, db)
+
+    # Fixed replies; anything unrecognised gets the help message
+    return COMMAND_REPLIES.get(text, HELP_MESSAGE)
 
 
 async def handle_subscribe(phone: str, text: str, db: Session) -> str:
@@ -126,50 +165,24 @@ async def handle_subscribe(phone: str, text: str, db: Session) -> str:
     parts = text.replace("subscribe", "").strip()
 
     if not parts:
-        return (
-            "Please specify districts to subscribe to.\n\n"
-            "Example: *subscribe Colombo, Gampaha*\n\n"
-            "Available districts: Colombo, Gampaha, Kalutara, Kandy, Matale, "
-            "Nuwara Eliya, Galle, Matara, Hambantota, Jaffna, Kilinochchi, "
-            "Mannar, Vavuniya, Mullaitivu, Batticaloa, Ampara, Trincomalee, "
-            "Kurunegala, Puttalam, Anuradhapura, Polonnaruwa, Badulla, "
-            "Monaragala, Ratnapura, Kegalle"
-        )
+        return SUBSCRIBE_USAGE_MESSAGE
 
     # Parse comma-separated districts
     districts = [d.strip().title() for d in parts.split(",")]
 
     # Validate districts
-    valid_districts = {
-        "Colombo", "Gampaha", "Kalutara", "Kandy", "Matale", "Nuwara Eliya",
-        "Galle", "Matara", "Hambantota", "Jaffna", "Kilinochchi", "Mannar",
-        "Vavuniya", "Mullaitivu", "Batticaloa", "Ampara", "Trincomalee",
-        "Kurunegala", "Puttalam", "Anuradhapura", "Polonnaruwa", "Badulla",
-        "Monaragala", "Ratnapura", "Kegalle"
-    }
-
-    invalid = [d for d in districts if d not in valid_districts]
+    invalid = [d for d in districts if d not in VALID_DISTRICTS]
     if invalid:
         return f"Invalid districts: {', '.join(invalid)}\n\nPlease use valid Sri Lankan district names."
 
-    # Find or create subscriber
-    subscriber = db.query(Subscriber).filter(Subscriber.phone_number == phone).first()
-
-    if subscriber:
-        subscriber.districts = districts
-        subscriber.active = True
-        subscriber.whatsapp_opted_in = True
-        subscriber.channel = "whatsapp"
-    else:
-        subscriber = Subscriber(
-            phone_number=phone,
-            channel="whatsapp",
-            whatsapp_opted_in=True,
-            active=True,
-        )
-        subscriber.districts = districts
-        db.add(subscriber)
-
+    # Create or update the subscriber in one statement
+    subscription = {
+        "districts": districts,
+        "channel": "whatsapp",
+        "whatsapp_opted_in": True,
+        "active": True,
+    }
+    db.execute(upsert_subscriber({"phone_number": phone, **subscription}, subscription))
     db.commit()
 
     return (
@@ -183,11 +196,14 @@ async def handle_subscribe(phone: str, text: str, db: Session) -> str:
 
 async def handle_unsubscribe(phone: str, db: Session) -> str:
     """Handle unsubscribe command"""
-    subscriber = db.query(Subscriber).filter(Subscriber.phone_number == phone).first()
+    result = db.execute(
+        update(Subscriber)
+        .where(Subscriber.phone_number == phone)
+        .values(active=False)
+    )
+    db.commit()
 
-    if subscriber:
-        subscriber.active = False
-        db.commit()
+    if result.rowcount:
         return "You have been unsubscribed from flood alerts.\n\nReply *subscribe [districts]* to re-subscribe."
     else:
         return "You are not currently subscribed to any alerts."
@@ -195,9 +211,13 @@ async def handle_unsubscribe(phone: str, db: Session) -> str:
 
 async def handle_status(phone: str, db: Session) -> str:
     """Handle status command"""
-    subscriber = db.query(Subscriber).filter(Subscriber.phone_number == phone).first()
+    # Only the displayed columns, and only for an active subscription
+    subscriber = db.execute(
+        select(Subscriber.districts, Subscriber.language)
+        .where(Subscriber.phone_number == phone, Subscriber.active == True)
+    ).first()
 
-    if subscriber and subscriber.active:
+    if subscriber:
         districts = subscriber.districts
         return (
             f"*Your Subscription Status*\n\n"
@@ -214,30 +234,30 @@ async def handle_status(phone: str, db: Session) -> str:
         )
 
 
+# Exact-match commands that need the subscriber record
+COMMAND_HANDLERS = {
+    "unsubscribe": handle_unsubscribe,
+    "stop": handle_unsubscribe,
+    "status": handle_status,
+}
+
+# Exact-match commands with a fixed reply
+COMMAND_REPLIES = {
+    "help": HELP_MESSAGE,
+    "?": HELP_MESSAGE,
+    "hi": WELCOME_MESSAGE,
+    "hello": WELCOME_MESSAGE,
+}
+
+
 def get_help_message() -> str:
     """Return help message"""
-    return (
-        "*FloodWatch Sri Lanka*\n\n"
-        "Get real-time flood alerts for your district.\n\n"
-        "*Commands:*\n"
-        "- *subscribe [districts]* - Subscribe to alerts\n"
-        "  Example: subscribe Colombo, Gampaha\n\n"
-        "- *unsubscribe* - Stop receiving alerts\n\n"
-        "- *status* - Check your subscription\n\n"
-        "- *help* - Show this message\n\n"
-        "Visit frontend-iklxt07wf-thaaarus-projects.vercel.app for the full map"
-    )
+    return HELP_MESSAGE
 
 
 def get_welcome_message() -> str:
     """Return welcome message"""
-    return (
-        "Welcome to *FloodWatch Sri Lanka*!\n\n"
-        "I can help you stay informed about flood conditions in your area.\n\n"
-        "To get started, subscribe to alerts for your district:\n"
-        "*subscribe Colombo*\n\n"
-        "Or reply *help* for more options."
-    )
+    return WELCOME_MESSAGE
 
 
 # ============================================================
@@ -255,27 +275,23 @@ async def api_subscribe(
     Note: User must first message the WhatsApp number to opt-in
     before they can receive messages (WhatsApp/Twilio policy).
     """
-    phone = request.phone_number.replace("+", "").replace(" ", "")
-
-    subscriber = db.query(Subscriber).filter(Subscriber.phone_number == phone).first()
+    phone = request.phone_number.translate(_PHONE_STRIP)
 
-    if subscriber:
-        subscriber.districts = request.districts
-        subscriber.language = request.language
-        subscriber.channel = "whatsapp"
-        subscriber.active = True
-    else:
-        subscriber = Subscriber(
-            phone_number=phone,
-            language=request.language,
-            channel="whatsapp",
-            active=True,
+    subscription = {
+        "districts": request.districts,
+        "language": request.language,
+        "channel": "whatsapp",
+        "active": True,
+    }
+    subscriber = db.execute(
+        upsert_subscriber({"phone_number": phone, **subscription}, subscription).returning(
+            Subscriber.phone_number,
+            Subscriber.districts,
+            Subscriber.language,
+            Subscriber.whatsapp_opted_in,
         )
-        subscriber.districts = request.districts
-        db.add(subscriber)
-
+    ).one()
     db.commit()
-    db.refresh(subscriber)
 
     # Send confirmation message via WhatsApp
     message_sent = False
@@ -384,21 +400,16 @@ async def broadcast_alert(
             detail="WhatsApp not configured"
         )
 
-    # Get subscribers for this district who are opted-in
-    subscribers = db.query(Subscriber).filter(
-        Subscriber.channel == "whatsapp",
-        Subscriber.whatsapp_opted_in == True,
-        Subscriber.active == True,
-    ).all()
-
-    # Filter by district (stored as JSON array)
-    eligible = []
-    for sub in subscribers:
-        if district in sub.districts:
-            eligible.append({
-                "phone_number": sub.phone_number,
-                "language": sub.language,
-            })
+    # Get opted-in subscribers for this district (district membership checked in SQL)
+    rows = db.execute(
+        select(Subscriber.phone_number, Subscriber.language).where(
+            Subscriber.channel == "whatsapp",
+            Subscriber.whatsapp_opted_in == True,
+            Subscriber.active == True,
+            subscribed_to_district(district),
+        )
+    ).mappings().all()
+    eligible = [dict(row) for row in rows]
 
     if not eligible:
         return {
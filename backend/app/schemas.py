@@ -1,8 +1,12 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional
 from datetime import datetime
 import re
 
+# Sri Lankan phone number format: +94 followed by 9 digits
+PHONE_RE = re.compile(r"^\+94[0-9]{9}$")
+SUPPORTED_LANGUAGES = frozenset({"en", "si", "ta"})
+
 
 class SubscriberCreate(BaseModel):
     phone_number: str
@@ -12,16 +16,14 @@ class SubscriberCreate(BaseModel):
     @field_validator("phone_number")
     @classmethod
     def validate_phone(cls, v: str) -> str:
-        # Sri Lankan phone number format: +94 followed by 9 digits
-        pattern = r"^\+94[0-9]{9}$"
-        if not re.match(pattern, v):
+        if not PHONE_RE.match(v):
             raise ValueError("Invalid Sri Lankan phone number. Format: +94XXXXXXXXX")
         return v
 
     @field_validator("language")
     @classmethod
     def validate_language(cls, v: str) -> str:
-        if v not in ["en", "si", "ta"]:
+        if v not in SUPPORTED_LANGUAGES:
             raise ValueError("Language must be 'en', 'si', or 'ta'")
         return v
 
@@ -34,8 +36,7 @@ class SubscriberResponse(BaseModel):
     active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UnsubscribeRequest(BaseModel):
@@ -51,8 +52,18 @@ class AlertResponse(BaseModel):
     message: Optional[str]
     sent_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class HourlyForecast(BaseModel):
+    time: Optional[str] = None
+    precipitation_mm: Optional[float] = None
+    precipitation_probability: Optional[float] = None
+    temperature_c: Optional[float] = None
+    humidity_percent: Optional[float] = None
+    cloud_cover: Optional[float] = None
+    wind_speed_kmh: Optional[float] = None
+    wind_gusts_kmh: Optional[float] = None
 
 
 class WeatherResponse(BaseModel):
@@ -63,7 +74,7 @@ class WeatherResponse(BaseModel):
     rainfall_24h_mm: float
     temperature_c: Optional[float]
     humidity_percent: Optional[int]
-    forecast_24h: list[dict]
+    forecast_24h: list[HourlyForecast]
     alert_level: str
     last_updated: datetime
 
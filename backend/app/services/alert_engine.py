@@ -1,63 +1,92 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
-from ..models import AlertHistory, Subscriber, WeatherLog
+from ..models import AlertHistory, Subscriber, subscribed_to_district
 from ..services.open_meteo import OpenMeteoService
 from ..services.gdacs import GDACSService
 from ..services.twilio_sms import get_sms_service
 from ..services.whatsapp_service import whatsapp_service
-from ..services.districts_service import get_all_districts
+from ..services.districts_service import get_district_columns
+from ..services.weather_log_buffer import queue_weather_log, flush_weather_logs
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Stateless upstream clients shared by every engine instance (one per scheduler tick)
+_weather_service = OpenMeteoService()
+_gdacs_service = GDACSService()
+
+# Window in which a repeat alert of the same level for a district is suppressed
+RECENT_ALERT_HOURS = 6
+
+# Ascending yellow/orange/red thresholds, read from settings once at import
+ALERT_THRESHOLDS = (settings.threshold_yellow, settings.threshold_orange, settings.threshold_red)
+ALERT_LEVELS = (None, "yellow", "orange", "red")
+
+
+@dataclass(slots=True)
+class AlertResult:
+    """An alert recorded and sent during a check."""
+    id: int
+    district: str
+    level: str
+    rainfall_mm: float
+    source: str
+    message: str
+
 
 class AlertEngine:
     """Engine for processing weather data and triggering alerts."""
 
     def __init__(self, db: Session):
         self.db = db
-        self.weather_service = OpenMeteoService()
-        self.gdacs_service = GDACSService()
+        self.weather_service = _weather_service
+        self.gdacs_service = _gdacs_service
         self.sms_service = get_sms_service()
 
     def get_alert_level(self, rainfall_mm: float) -> Optional[str]:
         """Determine alert level based on rainfall. Returns None if below threshold."""
-        if rainfall_mm >= settings.threshold_red:
-            return "red"
-        elif rainfall_mm >= settings.threshold_orange:
-            return "orange"
-        elif rainfall_mm >= settings.threshold_yellow:
-            return "yellow"
-        return None
-
-    async def check_all_districts(self) -> list[dict]:
+        return ALERT_LEVELS[bisect_right(ALERT_THRESHOLDS, rainfall_mm)]
+
+    async def check_all_districts(self) -> list[AlertResult]:
         """
         Check weather conditions for all districts and trigger alerts if needed.
         Returns list of triggered alerts.
         """
-        districts = get_all_districts()
+        districts = get_district_columns()
         triggered_alerts = []
+        cutoff = self._recent_alert_cutoff()
 
-        for district in districts:
-            try:
-                # Fetch current weather
-                weather = await self.weather_service.get_weather(
-                    district["latitude"],
-                    district["longitude"]
-                )
+        # One multi-location request for every district; results come back in input order
+        try:
+            results = await self.weather_service.get_weather_batch(
+                list(zip(districts.lats.tolist(), districts.lons.tolist()))
+            )
+        except Exception as e:
+            logger.error(f"Error fetching district weather: {e}")
+            results = []
 
+        for name, weather in zip(districts.names, results):
+            if weather is None:
+                # Already logged by get_weather_batch; skip just this district
+                continue
+            try:
                 rainfall_24h = weather.get("rainfall_24h_mm", 0.0)
 
-                # Log weather data
-                self._log_weather(
-                    district["name"],
-                    rainfall_24h,
-                    weather.get("temperature_c"),
-                    weather.get("humidity_percent")
+                # Queue weather log row; written in one bulk insert below
+                queue_weather_log(
+                    district=name,
+                    rainfall_mm=rainfall_24h,
+                    temperature_c=weather.get("temperature_c"),
+                    humidity_percent=weather.get("humidity_percent")
                 )
 
                 # Check if alert threshold is met
@@ -65,9 +94,9 @@ class AlertEngine:
 
                 if alert_level:
                     # Check if we've already sent an alert for this district recently
-                    if not self._has_recent_alert(district["name"], alert_level):
+                    if not self._has_recent_alert(name, alert_level, cutoff):
                         alert = await self._trigger_alert(
-                            district["name"],
+                            name,
                             alert_level,
                             rainfall_24h,
                             "open-meteo"
@@ -75,69 +104,86 @@ class AlertEngine:
                         triggered_alerts.append(alert)
 
             except Exception as e:
-                logger.error(f"Error checking district {district['name']}: {e}")
+                logger.error(f"Error checking district {name}: {e}")
+
+        # One commit for the tick's alert records, one bulk insert for its weather logs
+        self.db.commit()
+        flush_weather_logs()
 
         return triggered_alerts
 
-    async def check_gdacs_alerts(self) -> list[dict]:
+    async def check_gdacs_alerts(self) -> list[AlertResult]:
         """Check GDACS for any flood alerts in Sri Lanka."""
         triggered_alerts = []
+        cutoff = self._recent_alert_cutoff()
 
         try:
             gdacs_alerts = await self.gdacs_service.get_flood_alerts()
 
+            # One candidate per (closest district, level); the first alert's description wins
+            candidates = {}
             for gdacs_alert in gdacs_alerts:
-                alert_level = self.gdacs_service.gdacs_level_to_our_level(
-                    gdacs_alert["alert_level"]
-                )
-
-                # Find closest district
                 district = self._find_closest_district(
                     gdacs_alert["latitude"],
                     gdacs_alert["longitude"]
                 )
+                if not district:
+                    continue
+                alert_level = self.gdacs_service.gdacs_level_to_our_level(
+                    gdacs_alert["alert_level"]
+                )
+                candidates.setdefault(
+                    (district, alert_level),
+                    gdacs_alert.get("description", "GDACS flood alert")
+                )
 
-                if district and not self._has_recent_alert(district, alert_level):
-                    alert = await self._trigger_alert(
-                        district,
-                        alert_level,
-                        0.0,  # Rainfall not provided by GDACS
-                        "gdacs",
-                        gdacs_alert.get("description", "GDACS flood alert")
-                    )
-                    triggered_alerts.append(alert)
+            recent = self._recent_alert_pairs(candidates.keys(), cutoff)
+
+            for (district, alert_level), description in candidates.items():
+                if (district, alert_level) in recent:
+                    continue
+                alert = await self._trigger_alert(
+                    district,
+                    alert_level,
+                    0.0,  # Rainfall not provided by GDACS
+                    "gdacs",
+                    description
+                )
+                triggered_alerts.append(alert)
 
         except Exception as e:
             logger.error(f"Error checking GDACS: {e}")
 
+        self.db.commit()
+
         return triggered_alerts
 
-    def _log_weather(
-        self,
-        district: str,
-        rainfall_mm: float,
-        temperature_c: Optional[float],
-        humidity_percent: Optional[int]
-    ):
-        """Log weather data to database."""
-        log = WeatherLog(
-            district=district,
-            rainfall_mm=rainfall_mm,
-            temperature_c=temperature_c,
-            humidity_percent=humidity_percent
+    @staticmethod
+    def _recent_alert_cutoff(hours: int = RECENT_ALERT_HOURS) -> datetime:
+        """Naive UTC cutoff for duplicate-alert checks (sent_at is a naive UTC timestamp)."""
+        return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours)
+
+    def _recent_alert_pairs(self, pairs, cutoff: datetime) -> set[tuple[str, str]]:
+        """Return the (district, level) pairs that already had an alert since cutoff, in one query."""
+        pairs = list(pairs)
+        if not pairs:
+            return set()
+        return set(self.db.execute(
+            select(AlertHistory.district, AlertHistory.alert_level).where(
+                tuple_(AlertHistory.district, AlertHistory.alert_level).in_(pairs),
+                AlertHistory.sent_at >= cutoff
+            ).distinct()
+        ).tuples())
+
+    def _has_recent_alert(self, district: str, level: str, cutoff: datetime) -> bool:
+        """Check if an alert of the same level was sent for this district since cutoff."""
+        return self.db.scalar(
+            select(AlertHistory.id).where(
+                AlertHistory.district == district,
+                AlertHistory.alert_level == level,
+                AlertHistory.sent_at >= cutoff
+            ).exists().select()
         )
-        self.db.add(log)
-        self.db.commit()
-
-    def _has_recent_alert(self, district: str, level: str, hours: int = 6) -> bool:
-        """Check if an alert of the same level was sent recently for this district."""
-        cutoff = datetime.utcnow() - timedelta(hours=hours)
-        existing = self.db.query(AlertHistory).filter(
-            AlertHistory.district == district,
-            AlertHistory.alert_level == level,
-            AlertHistory.sent_at >= cutoff
-        ).first()
-        return existing is not None
 
     async def _trigger_alert(
         self,
@@ -146,7 +192,7 @@ class AlertEngine:
         rainfall_mm: float,
         source: str,
         message: Optional[str] = None
-    ) -> dict:
+    ) -> AlertResult:
         """Create alert record and send SMS to subscribers."""
         # Default message
         if not message:
@@ -161,22 +207,22 @@ class AlertEngine:
             message=message
         )
         self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
+        # Flush for the id; the caller commits once per check
+        self.db.flush()
 
         logger.info(f"Alert triggered: {district} - {level} - {rainfall_mm}mm")
 
         # Send SMS to subscribers
         await self._notify_subscribers(district, level, rainfall_mm)
 
-        return {
-            "id": alert.id,
-            "district": district,
-            "level": level,
-            "rainfall_mm": rainfall_mm,
-            "source": source,
-            "message": message
-        }
+        return AlertResult(
+            id=alert.id,
+            district=district,
+            level=level,
+            rainfall_mm=rainfall_mm,
+            source=source,
+            message=message
+        )
 
     async def _notify_subscribers(
         self,
@@ -185,59 +231,61 @@ class AlertEngine:
         rainfall_mm: float
     ):
         """Send alerts to all active subscribers for the given district via SMS or WhatsApp."""
-        # Query all active subscribers
-        all_subscribers = self.db.query(Subscriber).filter(
-            Subscriber.active == True
+        # Active subscribers for this district (district membership checked in SQL)
+        subscribers = self.db.execute(
+            select(
+                Subscriber.phone_number,
+                Subscriber.language,
+                Subscriber.channel,
+                Subscriber.whatsapp_opted_in,
+            ).where(
+                Subscriber.active == True,
+                subscribed_to_district(district),
+            )
         ).all()
 
-        # Filter by district (districts is stored as JSON)
-        subscribers = [s for s in all_subscribers if district in s.districts]
-
         logger.info(f"Notifying {len(subscribers)} subscribers for {district}")
 
-        sms_sent = 0
-        sms_failed = 0
-        whatsapp_sent = 0
-        whatsapp_failed = 0
+        # Global configuration check, done once rather than per subscriber
+        whatsapp_available = whatsapp_service.is_configured()
 
+        # Recipients grouped by (language, channel) so each group's message is rendered once
+        groups = defaultdict(list)
         for subscriber in subscribers:
+            # Send via WhatsApp if opted in, otherwise SMS
+            if subscriber.channel == 'whatsapp' and subscriber.whatsapp_opted_in and whatsapp_available:
+                channel = 'whatsapp'
+            else:
+                channel = 'sms'
+            groups[(subscriber.language, channel)].append(subscriber.phone_number)
+
+        async def send_group(language: str, channel: str, phones: list[str]) -> int:
+            """Send the alert to one group; returns the number sent."""
             try:
-                channel = getattr(subscriber, 'channel', 'sms') or 'sms'
-                whatsapp_opted_in = getattr(subscriber, 'whatsapp_opted_in', False)
-
-                # Send via WhatsApp if opted in, otherwise SMS
-                if channel == 'whatsapp' and whatsapp_opted_in and whatsapp_service.is_configured():
-                    result = await whatsapp_service.send_alert_message(
-                        to_phone=subscriber.phone_number,
-                        district=district,
-                        alert_level=level.upper(),
-                        rainfall_mm=rainfall_mm,
-                        language=subscriber.language
-                    )
-                    if result.get("success"):
-                        whatsapp_sent += 1
-                    else:
-                        whatsapp_failed += 1
-                else:
-                    # Fall back to SMS
-                    result = self.sms_service.send_alert(
-                        subscriber.phone_number,
-                        district,
-                        level,
-                        rainfall_mm,
-                        subscriber.language
+                if channel == 'whatsapp':
+                    return await whatsapp_service.send_bulk_alert(
+                        phones, district, level.upper(), rainfall_mm, language
                     )
-                    if result:
-                        sms_sent += 1
-                    else:
-                        sms_failed += 1
-
+                # The Twilio SMS client is blocking, so the bulk send runs off the event loop
+                return await asyncio.to_thread(
+                    self.sms_service.send_bulk_alert, phones, district, level, rainfall_mm, language
+                )
             except Exception as e:
-                logger.error(f"Error sending alert to {subscriber.phone_number}: {e}")
-                if channel == 'whatsapp':
-                    whatsapp_failed += 1
-                else:
-                    sms_failed += 1
+                logger.error(f"Error sending {channel} alerts ({language}) for {district}: {e}")
+                return 0
+
+        sent_counts = await asyncio.gather(
+            *(send_group(language, channel, phones) for (language, channel), phones in groups.items())
+        )
+
+        sms_sent = sms_failed = whatsapp_sent = whatsapp_failed = 0
+        for ((_, channel), phones), sent in zip(groups.items(), sent_counts):
+            if channel == 'whatsapp':
+                whatsapp_sent += sent
+                whatsapp_failed += len(phones) - sent
+            else:
+                sms_sent += sent
+                sms_failed += len(phones) - sent
 
         logger.info(
             f"Notifications sent - SMS: {sms_sent} (failed: {sms_failed}), "
@@ -246,15 +294,9 @@ class AlertEngine:
 
     def _find_closest_district(self, lat: float, lon: float) -> Optional[str]:
         """Find the district closest to the given coordinates."""
-        districts = get_all_districts()
-        closest = None
-        min_distance = float("inf")
-
-        for district in districts:
-            # Simple Euclidean distance (good enough for small area like Sri Lanka)
-            d = ((district["latitude"] - lat) ** 2 + (district["longitude"] - lon) ** 2) ** 0.5
-            if d < min_distance:
-                min_distance = d
-                closest = district["name"]
-
-        return closest
+        districts = get_district_columns()
+        if not districts.names:
+            return None
+        # Squared Euclidean distance (good enough for small area like Sri Lanka)
+        distances = (districts.lats - lat) ** 2 + (districts.lons - lon) ** 2
+        return districts.names[int(distances.argmin())]
@@ -0,0 +1,17 @@
+"""
+Upstream cache registry.
+The scheduler keeps each of these warm with its own refresh job, fired once at
+startup and then just before the cache's TTL runs out.
+"""
+from .river_fetcher import river_fetcher
+from .weatherapi_alerts import weatherapi_service
+from .marine_weather import marine_service
+from .irrigation_fetcher import irrigation_fetcher
+
+# Cached upstream feeds, by name
+UPSTREAM_CACHES = {
+    "rivers": river_fetcher,
+    "weather_alerts": weatherapi_service,
+    "marine": marine_service,
+    "irrigation": irrigation_fetcher,
+}
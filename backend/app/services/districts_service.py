@@ -1,8 +1,11 @@
-import json
 import os
+from dataclasses import dataclass
 from typing import Optional
 from functools import lru_cache
 
+import numpy as np
+import orjson
+
 
 @lru_cache()
 def _load_districts_data() -> dict:
@@ -10,29 +13,50 @@ def _load_districts_data() -> dict:
     data_path = os.path.join(
         os.path.dirname(__file__), "..", "data", "districts.json"
     )
-    with open(data_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(data_path, "rb") as f:
+        return orjson.loads(f.read())
 
 
-def get_all_districts() -> list[dict]:
+@lru_cache()
+def get_all_districts() -> tuple[dict, ...]:
     """Get all district information."""
-    data = _load_districts_data()
-    return data["districts"]
+    return tuple(_load_districts_data()["districts"])
 
 
-def get_valid_districts() -> list[str]:
-    """Get list of valid district names."""
-    data = _load_districts_data()
-    return [d["name"] for d in data["districts"]]
+@lru_cache()
+def get_valid_districts() -> tuple[str, ...]:
+    """Get valid district names."""
+    return tuple(d["name"] for d in _load_districts_data()["districts"])
+
+
+@dataclass(frozen=True, slots=True)
+class DistrictColumns:
+    """District names and coordinates as parallel columns (same order as get_all_districts)."""
+    names: tuple[str, ...]
+    lats: np.ndarray
+    lons: np.ndarray
+
+
+@lru_cache()
+def get_district_columns() -> DistrictColumns:
+    """Get the district list laid out column-wise for vectorized use."""
+    districts = _load_districts_data()["districts"]
+    return DistrictColumns(
+        names=tuple(d["name"] for d in districts),
+        lats=np.asarray([d["latitude"] for d in districts], dtype=float),
+        lons=np.asarray([d["longitude"] for d in districts], dtype=float),
+    )
+
+
+@lru_cache()
+def _districts_by_lower_name() -> dict[str, dict]:
+    """Lowercased district name -> district record."""
+    return {d["name"].lower(): d for d in _load_districts_data()["districts"]}
 
 
 def get_district_by_name(name: str) -> Optional[dict]:
     """Get district info by name (case-insensitive)."""
-    data = _load_districts_data()
-    for district in data["districts"]:
-        if district["name"].lower() == name.lower():
-            return district
-    return None
+    return _districts_by_lower_name().get(name.lower())
 
 
 def get_bounding_box() -> dict:
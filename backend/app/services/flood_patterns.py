@@ -3,13 +3,23 @@ Flood Pattern Analysis Service
 Analyzes historical weather data to identify flood patterns in Sri Lanka.
 Uses Open-Meteo Historical API for 30+ years of rainfall data.
 """
-import httpx
+import asyncio
+import heapq
 import logging
+import os
+import tempfile
+from pathlib import Path
 from typing import Optional
 from datetime import datetime, timedelta, date
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 import statistics
 
+import numpy as np
+import orjson
+
+from ..http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 # Sri Lanka district coordinates for historical data fetching
@@ -55,6 +65,121 @@ MONSOON_SEASONS = {
     "inter_2": {"months": [10], "name": "Second Inter-Monsoon"},
 }
 
+# Concurrent per-year requests to the Open-Meteo archive API
+HISTORICAL_FETCH_CONCURRENCY = 8
+
+# Completed years of daily rainfall, one .npz per location and year. Past years
+# never change, so these persist across restarts instead of being refetched.
+HISTORICAL_CACHE_DIR = Path(__file__).parent.parent.parent / "cache" / "historical_rainfall"
+
+# In-memory cache bounds: analyses per (district, years, day), and location-years of
+# rainfall (25 districts x ~30 years fit; completed years reload from disk if evicted)
+ANALYSIS_CACHE_SIZE = 64
+RAINFALL_CACHE_SIZE = 1024
+
+# Extreme rainfall days reported per analysis
+MAX_EXTREME_EVENTS = 50
+
+SEASON_LABELS = {
+    "southwest": "Southwest Monsoon (May-Sep)",
+    "northeast": "Northeast Monsoon (Nov-Feb)",
+    "inter_monsoon": "Inter-Monsoon (Mar-Apr, Oct)",
+}
+
+# Season index per month (1-12; slot 0 unused), positions into SEASON_ORDER
+SEASON_ORDER = ("southwest", "northeast", "inter_monsoon")
+MONTH_TO_SEASON = np.array([-1, 1, 1, 2, 2, 0, 0, 0, 0, 0, 2, 1, 1], dtype=np.int8)
+
+
+@dataclass(frozen=True, slots=True)
+class RainfallColumns:
+    """Daily rainfall laid out as parallel arrays (one entry per day)."""
+    date: np.ndarray  # ISO date strings
+    year: np.ndarray  # int16
+    month: np.ndarray  # int8
+    precip: np.ndarray  # float64, daily precipitation in mm
+
+    def __len__(self) -> int:
+        return self.precip.size
+
+    @classmethod
+    def from_daily(cls, times, precip) -> "RainfallColumns":
+        """Build columns from a daily time/precipitation series, treating missing values as 0."""
+        dates = np.asarray(times, dtype="U10")
+        days = dates.astype("datetime64[D]")
+        values = np.zeros(dates.size)
+        n = min(dates.size, len(precip))
+        values[:n] = np.asarray(precip[:n], dtype=np.float64)  # None becomes NaN
+        np.nan_to_num(values, copy=False, nan=0.0)
+        return cls(
+            date=dates,
+            year=(days.astype("datetime64[Y]").astype(np.int64) + 1970).astype(np.int16),
+            month=(days.astype("datetime64[M]").astype(np.int64) % 12 + 1).astype(np.int8),
+            precip=values,
+        )
+
+    @classmethod
+    def concat(cls, parts: list["RainfallColumns"]) -> "RainfallColumns":
+        """Join per-year columns, in order, into one series."""
+        if not parts:
+            return cls.from_daily([], [])
+        return cls(
+            date=np.concatenate([p.date for p in parts]),
+            year=np.concatenate([p.year for p in parts]),
+            month=np.concatenate([p.month for p in parts]),
+            precip=np.concatenate([p.precip for p in parts]),
+        )
+
+
+def _year_cache_path(lat_rounded: float, lon_rounded: float, year: int) -> Path:
+    return HISTORICAL_CACHE_DIR / f"{lat_rounded:.2f}_{lon_rounded:.2f}_{year}.npz"
+
+
+def _load_cached_year(path: Path) -> Optional[RainfallColumns]:
+    """Load a completed year from disk, or None if it isn't cached."""
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as npz:
+            return RainfallColumns.from_daily(npz["date"], npz["precip"])
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable rainfall cache {path.name}: {e}")
+        return None
+
+
+def _save_cached_year(path: Path, year_data: RainfallColumns):
+    """Write a completed year to disk (atomically, so readers never see a partial file)."""
+    tmp_path = None
+    try:
+        HISTORICAL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=HISTORICAL_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, date=year_data.date, precip=year_data.precip)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write rainfall cache {path.name}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+class _LRUCache(OrderedDict):
+    """Dict holding at most maxsize entries, evicting the least recently used."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
 
 class FloodPatternAnalyzer:
     """Analyzes historical flood patterns using weather data"""
@@ -63,8 +188,9 @@ class FloodPatternAnalyzer:
     CACHE_DURATION_HOURS = 24  # Cache results for 24 hours
 
     def __init__(self):
-        self._analysis_cache: dict = {}  # {district_years: {data, cached_at}}
-        self._rainfall_cache: dict = {}  # {(lat, lon, year): data}
+        # Bounded, so per-day keys (current year, analysis date) can't accumulate forever
+        self._analysis_cache = _LRUCache(ANALYSIS_CACHE_SIZE)  # {district_years: {data, cached_at}}
+        self._rainfall_cache = _LRUCache(RAINFALL_CACHE_SIZE)  # {(lat, lon, year): data}
 
     async def fetch_historical_rainfall(
         self,
@@ -72,128 +198,138 @@ class FloodPatternAnalyzer:
         lon: float,
         start_year: int = 1995,
         end_year: int = None  # Will default to current year
-    ) -> list[dict]:
+    ) -> RainfallColumns:
         """
         Fetch historical daily rainfall data from Open-Meteo.
-        Returns daily precipitation totals. Uses per-year caching.
+        Returns daily precipitation totals as columns. Uses per-year caching.
         For current year, fetches data up to yesterday.
+        Uncached years are fetched concurrently.
         """
-        from datetime import date
+        today = date.today()
 
         # Default end_year to current year
         if end_year is None:
-            end_year = date.today().year
+            end_year = today.year
 
-        yesterday = date.today() - timedelta(days=1)
+        yesterday = today - timedelta(days=1)
 
-        all_data = []
         lat_rounded = round(lat, 2)
         lon_rounded = round(lon, 2)
 
-        # Fetch in yearly chunks to avoid API limits
+        cache_keys = {}
+        end_dates = {}
         for year in range(start_year, end_year + 1):
-            # For current year, use special cache key including yesterday's date
-            if year == date.today().year:
-                cache_key = (lat_rounded, lon_rounded, year, yesterday.isoformat())
+            # For current year, use special cache key including yesterday's date,
+            # and only fetch up to yesterday
+            if year == today.year:
+                cache_keys[year] = (lat_rounded, lon_rounded, year, yesterday.isoformat())
+                end_dates[year] = yesterday.isoformat()
             else:
-                cache_key = (lat_rounded, lon_rounded, year)
+                cache_keys[year] = (lat_rounded, lon_rounded, year)
+                end_dates[year] = f"{year}-12-31"
 
-            # Check cache first
-            if cache_key in self._rainfall_cache:
-                all_data.extend(self._rainfall_cache[cache_key])
+        missing = []
+        for year, key in cache_keys.items():
+            if key in self._rainfall_cache:
                 continue
+            # Completed years may already be on disk from a previous run
+            year_data = None if year == today.year else _load_cached_year(
+                _year_cache_path(lat_rounded, lon_rounded, year)
+            )
+            if year_data is not None:
+                self._rainfall_cache[key] = year_data
+            else:
+                missing.append(year)
+
+        if missing:
+            semaphore = asyncio.Semaphore(HISTORICAL_FETCH_CONCURRENCY)
+
+            async def fetch(year: int) -> Optional[RainfallColumns]:
+                async with semaphore:
+                    return await self._fetch_year(lat, lon, year, end_dates[year])
+
+            fetched = await asyncio.gather(*(fetch(year) for year in missing))
+            for year, year_data in zip(missing, fetched):
+                if year_data is not None:
+                    # Cache this year's data (on disk too, once the year is complete)
+                    self._rainfall_cache[cache_keys[year]] = year_data
+                    if year != today.year:
+                        _save_cached_year(_year_cache_path(lat_rounded, lon_rounded, year), year_data)
+
+        # Merge in year order; years that failed to fetch are skipped
+        return RainfallColumns.concat([
+            self._rainfall_cache[key] for key in cache_keys.values() if key in self._rainfall_cache
+        ])
+
+    async def _fetch_year(self, lat: float, lon: float, year: int, end_date: str) -> Optional[RainfallColumns]:
+        """Fetch daily rainfall from Jan 1 of year to end_date. Returns None if the request fails."""
+        try:
+            params = {
+                "latitude": lat,
+                "longitude": lon,
+                "start_date": f"{year}-01-01",
+                "end_date": end_date,
+                "daily": "precipitation_sum",
+                "timezone": "Asia/Colombo",
+            }
 
-            try:
-                # For current year, only fetch up to yesterday
-                if year == date.today().year:
-                    end_date = yesterday.isoformat()
-                else:
-                    end_date = f"{year}-12-31"
-
-                params = {
-                    "latitude": lat,
-                    "longitude": lon,
-                    "start_date": f"{year}-01-01",
-                    "end_date": end_date,
-                    "daily": "precipitation_sum,rain_sum",
-                    "timezone": "Asia/Colombo",
-                }
+            client = get_http_client()
+            response = await client.get(self.OPEN_METEO_HISTORICAL_URL, params=params, timeout=30.0)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
 
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(self.OPEN_METEO_HISTORICAL_URL, params=params)
-                    response.raise_for_status()
-                    data = response.json()
-
-                daily = data.get("daily", {})
-                times = daily.get("time", [])
-                precip = daily.get("precipitation_sum", [])
-                rain = daily.get("rain_sum", [])
-
-                year_data = []
-                for i, date_str in enumerate(times):
-                    record = {
-                        "date": date_str,
-                        "year": int(date_str[:4]),
-                        "month": int(date_str[5:7]),
-                        "day": int(date_str[8:10]),
-                        "precipitation_mm": precip[i] if i < len(precip) and precip[i] is not None else 0,
-                        "rain_mm": rain[i] if i < len(rain) and rain[i] is not None else 0,
-                    }
-                    year_data.append(record)
-
-                # Cache this year's data
-                self._rainfall_cache[cache_key] = year_data
-                all_data.extend(year_data)
-
-            except Exception as e:
-                logger.warning(f"Failed to fetch data for {year}: {e}")
-                continue
+            daily = data.get("daily", {})
+            return RainfallColumns.from_daily(
+                daily.get("time", []),
+                daily.get("precipitation_sum", []),
+            )
 
-        return all_data
+        except Exception as e:
+            logger.warning(f"Failed to fetch data for {year}: {e}")
+            return None
 
-    def analyze_monthly_patterns(self, rainfall_data: list[dict]) -> dict:
+    def analyze_monthly_patterns(self, columns: RainfallColumns) -> dict:
         """Analyze monthly rainfall patterns from historical data"""
-        monthly_totals = defaultdict(list)
-        monthly_max_daily = defaultdict(list)
-
-        for record in rainfall_data:
-            month = record["month"]
-            precip = record["precipitation_mm"]
-            monthly_totals[month].append(precip)
-            monthly_max_daily[month].append(precip)
+        precip = columns.precip
+        month_idx = columns.month.astype(np.intp) - 1
+        years, year_idx = np.unique(columns.year, return_inverse=True)
+        n_years = years.size
+
+        # All twelve months reduced together: a (month, year) grid of monthly sums
+        # plus per-month daily aggregates, each from a single bincount over the data
+        cell = month_idx * n_years + year_idx
+        monthly_sums = np.bincount(cell, weights=precip, minlength=12 * n_years).reshape(12, n_years)
+        has_data = np.bincount(cell, minlength=12 * n_years).reshape(12, n_years) > 0
+        years_per_month = has_data.sum(axis=1)
+        days = np.bincount(month_idx, minlength=12)
+        daily_totals = np.bincount(month_idx, weights=precip, minlength=12)
+        rainy_days = np.bincount(month_idx[precip > 1], minlength=12)
+        max_daily = np.zeros(12)
+        np.maximum.at(max_daily, month_idx, precip)
 
         patterns = {}
         for month in range(1, 13):
-            totals = monthly_totals.get(month, [0])
-            # Calculate monthly sum per year
-            years_data = defaultdict(float)
-            for record in rainfall_data:
-                if record["month"] == month:
-                    years_data[record["year"]] += record["precipitation_mm"]
-
-            monthly_sums = list(years_data.values()) if years_data else [0]
+            m = month - 1
+            # Monthly sum per year, over the years that have data for this month
+            sums = monthly_sums[m][has_data[m]] if days[m] else np.zeros(1)
+            avg_monthly = float(sums.mean())
+            month_max_daily = float(max_daily[m])
 
             patterns[month] = {
                 "month_name": datetime(2000, month, 1).strftime("%B"),
-                "avg_monthly_rainfall_mm": round(statistics.mean(monthly_sums), 1) if monthly_sums else 0,
-                "max_monthly_rainfall_mm": round(max(monthly_sums), 1) if monthly_sums else 0,
-                "min_monthly_rainfall_mm": round(min(monthly_sums), 1) if monthly_sums else 0,
-                "avg_daily_rainfall_mm": round(statistics.mean(totals), 2) if totals else 0,
-                "max_daily_rainfall_mm": round(max(totals), 1) if totals else 0,
-                "rainy_days_avg": round(len([t for t in totals if t > 1]) / max(1, len(set(r["year"] for r in rainfall_data if r["month"] == month))), 1),
-                "flood_risk": self._calculate_flood_risk(monthly_sums, totals),
+                "avg_monthly_rainfall_mm": round(avg_monthly, 1),
+                "max_monthly_rainfall_mm": round(float(sums.max()), 1),
+                "min_monthly_rainfall_mm": round(float(sums.min()), 1),
+                "avg_daily_rainfall_mm": round(float(daily_totals[m] / days[m]), 2) if days[m] else 0,
+                "max_daily_rainfall_mm": round(month_max_daily, 1),
+                "rainy_days_avg": round(int(rainy_days[m]) / max(1, int(years_per_month[m])), 1),
+                "flood_risk": self._calculate_flood_risk(avg_monthly, month_max_daily),
             }
 
         return patterns
 
-    def _calculate_flood_risk(self, monthly_sums: list, daily_values: list) -> str:
+    def _calculate_flood_risk(self, avg_monthly: float, max_daily: float) -> str:
         """Calculate flood risk based on historical rainfall patterns"""
-        if not monthly_sums:
-            return "LOW"
-
-        avg_monthly = statistics.mean(monthly_sums)
-        max_daily = max(daily_values) if daily_values else 0
-
         # High risk: avg monthly > 300mm or max daily > 100mm
         if avg_monthly > 300 or max_daily > 150:
             return "HIGH"
@@ -202,89 +338,79 @@ class FloodPatternAnalyzer:
         else:
             return "LOW"
 
-    def analyze_extreme_events(self, rainfall_data: list[dict], threshold_mm: float = 100) -> list[dict]:
+    def analyze_extreme_events(self, columns: RainfallColumns, threshold_mm: float = 100) -> list[dict]:
         """Identify extreme rainfall events (potential flood triggers)"""
-        extreme_events = []
-
-        for record in rainfall_data:
-            if record["precipitation_mm"] >= threshold_mm:
-                extreme_events.append({
-                    "date": record["date"],
-                    "precipitation_mm": record["precipitation_mm"],
-                    "month": record["month"],
-                    "year": record["year"],
-                })
-
-        # Sort by precipitation descending
-        extreme_events.sort(key=lambda x: x["precipitation_mm"], reverse=True)
-        return extreme_events[:50]  # Top 50 events
-
-    def analyze_seasonal_patterns(self, rainfall_data: list[dict]) -> dict:
-        """Analyze rainfall patterns by monsoon season"""
-        seasonal_data = {
-            "southwest": [],
-            "northeast": [],
-            "inter_monsoon": [],
-        }
-
-        for record in rainfall_data:
-            month = record["month"]
-            precip = record["precipitation_mm"]
+        qualifying = np.flatnonzero(columns.precip >= threshold_mm)
+        values = columns.precip[qualifying]
+        if qualifying.size > MAX_EXTREME_EVENTS:
+            # Bounded selection: find the 50th-largest value with a partition, keep
+            # everything above it plus the earliest days tied at it
+            cutoff = -np.partition(-values, MAX_EXTREME_EVENTS - 1)[MAX_EXTREME_EVENTS - 1]
+            keep = values > cutoff
+            tied = np.flatnonzero(values == cutoff)[:MAX_EXTREME_EVENTS - int(keep.sum())]
+            keep[tied] = True
+            qualifying, values = qualifying[keep], values[keep]
+        # Descending by precipitation; the stable sort keeps the earliest day on ties
+        top = qualifying[np.argsort(-values, kind="stable")]
+        return [
+            {
+                "date": event_date,
+                "precipitation_mm": precip,
+                "month": month,
+                "year": year,
+            }
+            for event_date, precip, month, year in zip(
+                columns.date[top].tolist(), columns.precip[top].tolist(),
+                columns.month[top].tolist(), columns.year[top].tolist(),
+            )
+        ]
 
-            if month in [5, 6, 7, 8, 9]:
-                seasonal_data["southwest"].append(precip)
-            elif month in [11, 12, 1, 2]:
-                seasonal_data["northeast"].append(precip)
-            else:
-                seasonal_data["inter_monsoon"].append(precip)
+    def analyze_seasonal_patterns(self, columns: RainfallColumns) -> dict:
+        """Analyze rainfall patterns by monsoon season"""
+        season_idx = MONTH_TO_SEASON[columns.month]
 
         result = {}
-        for season, data in seasonal_data.items():
-            if data:
+        for idx, season in enumerate(SEASON_ORDER):
+            data = columns.precip[season_idx == idx]
+            if data.size:
                 result[season] = {
-                    "name": {
-                        "southwest": "Southwest Monsoon (May-Sep)",
-                        "northeast": "Northeast Monsoon (Nov-Feb)",
-                        "inter_monsoon": "Inter-Monsoon (Mar-Apr, Oct)",
-                    }[season],
-                    "avg_daily_mm": round(statistics.mean(data), 2),
-                    "total_days": len(data),
-                    "rainy_days": len([d for d in data if d > 1]),
-                    "heavy_rain_days": len([d for d in data if d > 50]),
-                    "extreme_rain_days": len([d for d in data if d > 100]),
-                    "max_daily_mm": round(max(data), 1),
+                    "name": SEASON_LABELS[season],
+                    "avg_daily_mm": round(float(data.mean()), 2),
+                    "total_days": int(data.size),
+                    "rainy_days": int((data > 1).sum()),
+                    "heavy_rain_days": int((data > 50).sum()),
+                    "extreme_rain_days": int((data > 100).sum()),
+                    "max_daily_mm": round(float(data.max()), 1),
                 }
 
         return result
 
-    def analyze_yearly_trends(self, rainfall_data: list[dict]) -> list[dict]:
+    def analyze_yearly_trends(self, columns: RainfallColumns) -> list[dict]:
         """Analyze yearly rainfall trends"""
-        yearly_data = defaultdict(lambda: {"total": 0, "rainy_days": 0, "extreme_days": 0, "max_daily": 0})
-
-        for record in rainfall_data:
-            year = record["year"]
-            precip = record["precipitation_mm"]
-            yearly_data[year]["total"] += precip
-            if precip > 1:
-                yearly_data[year]["rainy_days"] += 1
-            if precip > 100:
-                yearly_data[year]["extreme_days"] += 1
-            yearly_data[year]["max_daily"] = max(yearly_data[year]["max_daily"], precip)
-
-        trends = []
-        for year in sorted(yearly_data.keys()):
-            data = yearly_data[year]
-            trends.append({
-                "year": year,
-                "total_rainfall_mm": round(data["total"], 1),
-                "rainy_days": data["rainy_days"],
-                "extreme_days": data["extreme_days"],
-                "max_daily_mm": round(data["max_daily"], 1),
-            })
+        precip = columns.precip
+        years, year_idx = np.unique(columns.year, return_inverse=True)
 
-        return trends
+        totals = np.bincount(year_idx, weights=precip, minlength=years.size)
+        rainy_days = np.bincount(year_idx[precip > 1], minlength=years.size)
+        extreme_days = np.bincount(year_idx[precip > 100], minlength=years.size)
+        max_daily = np.zeros(years.size)
+        np.maximum.at(max_daily, year_idx, precip)
 
-    def analyze_climate_change_trends(self, rainfall_data: list[dict], yearly_trends: list[dict]) -> dict:
+        return [
+            {
+                "year": year,
+                "total_rainfall_mm": round(total, 1),
+                "rainy_days": rainy,
+                "extreme_days": extreme,
+                "max_daily_mm": round(max_mm, 1),
+            }
+            for year, total, rainy, extreme, max_mm in zip(
+                years.tolist(), totals.tolist(), rainy_days.tolist(),
+                extreme_days.tolist(), max_daily.tolist(),
+            )
+        ]
+
+    def analyze_climate_change_trends(self, columns: RainfallColumns, yearly_trends: list[dict]) -> dict:
         """
         Analyze how climate has changed over 30 years.
         Compares decades and calculates trend statistics.
@@ -300,27 +426,31 @@ class FloodPatternAnalyzer:
         decade1_end = min_year + 10
         decade2_end = min_year + 20
 
-        decade1 = [y for y in yearly_trends if y["year"] < decade1_end]
-        decade2 = [y for y in yearly_trends if decade1_end <= y["year"] < decade2_end]
-        decade3 = [y for y in yearly_trends if y["year"] >= decade2_end]
+        def decade_of(year: int) -> int:
+            return 0 if year < decade1_end else (1 if year < decade2_end else 2)
+
+        # One pass to split the (sorted) yearly trends into decades
+        decades = ([], [], [])
+        for y in yearly_trends:
+            decades[decade_of(y["year"])].append(y)
 
         def calc_decade_stats(decade_data: list) -> dict:
             if not decade_data:
                 return None
+            n = len(decade_data)
+            total_extreme_days = sum(d["extreme_days"] for d in decade_data)
             return {
                 "years": f"{decade_data[0]['year']}-{decade_data[-1]['year']}",
-                "avg_annual_rainfall_mm": round(statistics.mean([d["total_rainfall_mm"] for d in decade_data]), 1),
-                "avg_rainy_days": round(statistics.mean([d["rainy_days"] for d in decade_data]), 1),
-                "avg_extreme_days": round(statistics.mean([d["extreme_days"] for d in decade_data]), 2),
-                "total_extreme_days": sum([d["extreme_days"] for d in decade_data]),
-                "max_daily_mm": max([d["max_daily_mm"] for d in decade_data]),
+                "avg_annual_rainfall_mm": round(sum(d["total_rainfall_mm"] for d in decade_data) / n, 1),
+                "avg_rainy_days": round(sum(d["rainy_days"] for d in decade_data) / n, 1),
+                "avg_extreme_days": round(total_extreme_days / n, 2),
+                "total_extreme_days": total_extreme_days,
+                "max_daily_mm": max(d["max_daily_mm"] for d in decade_data),
                 "wettest_year": max(decade_data, key=lambda x: x["total_rainfall_mm"]),
                 "driest_year": min(decade_data, key=lambda x: x["total_rainfall_mm"]),
             }
 
-        decade1_stats = calc_decade_stats(decade1)
-        decade2_stats = calc_decade_stats(decade2)
-        decade3_stats = calc_decade_stats(decade3)
+        decade1_stats, decade2_stats, decade3_stats = (calc_decade_stats(d) for d in decades)
 
         # Calculate changes between decades
         changes = []
@@ -374,40 +504,46 @@ class FloodPatternAnalyzer:
 
         # Calculate 5-year moving averages for trend line
         moving_avg_5yr = []
-        for i in range(len(yearly_trends)):
-            if i >= 4:  # Need at least 5 years
-                window = yearly_trends[i-4:i+1]
-                moving_avg_5yr.append({
-                    "year": yearly_trends[i]["year"],
-                    "avg_rainfall_mm": round(statistics.mean([w["total_rainfall_mm"] for w in window]), 1),
-                    "avg_extreme_days": round(statistics.mean([w["extreme_days"] for w in window]), 2),
-                })
-
-        # Extreme events by decade
+        for i in range(4, len(yearly_trends)):  # Need at least 5 years
+            window = yearly_trends[i-4:i+1]
+            moving_avg_5yr.append({
+                "year": yearly_trends[i]["year"],
+                "avg_rainfall_mm": round(sum(w["total_rainfall_mm"] for w in window) / 5, 1),
+                "avg_extreme_days": round(sum(w["extreme_days"] for w in window) / 5, 2),
+            })
+
+        # Extreme events by decade, bucketed with array ops: counts from a bincount over each
+        # event's decade index, top 5 per decade from one stable sort (ties keep the earliest day)
+        extreme_idx = np.flatnonzero(columns.precip >= 100)
+        extreme_precip = columns.precip[extreme_idx]
+        extreme_decade = np.searchsorted(
+            np.array([decade1_end, decade2_end]), columns.year[extreme_idx], side="right"
+        )
+        extreme_counts = np.bincount(extreme_decade, minlength=3).tolist()
+        by_decade = np.lexsort((-extreme_precip, extreme_decade))
+        top_extremes = [
+            by_decade[extreme_decade[by_decade] == decade][:5] for decade in range(3)
+        ]
+
         extreme_by_decade = {
-            "decade1": {"years": decade1_stats["years"] if decade1_stats else "", "count": 0, "events": []},
-            "decade2": {"years": decade2_stats["years"] if decade2_stats else "", "count": 0, "events": []},
-            "decade3": {"years": decade3_stats["years"] if decade3_stats else "", "count": 0, "events": []},
+            key: {
+                "years": stats["years"] if stats else "",
+                "count": extreme_counts[decade],
+                "events": [
+                    {"date": event_date, "precipitation_mm": precip}
+                    for event_date, precip in zip(
+                        columns.date[extreme_idx[top_extremes[decade]]].tolist(),
+                        extreme_precip[top_extremes[decade]].tolist(),
+                    )
+                ],
+            }
+            for decade, (key, stats) in enumerate((
+                ("decade1", decade1_stats),
+                ("decade2", decade2_stats),
+                ("decade3", decade3_stats),
+            ))
         }
 
-        for record in rainfall_data:
-            if record["precipitation_mm"] >= 100:
-                year = record["year"]
-                event = {"date": record["date"], "precipitation_mm": record["precipitation_mm"]}
-                if year < decade1_end:
-                    extreme_by_decade["decade1"]["count"] += 1
-                    extreme_by_decade["decade1"]["events"].append(event)
-                elif year < decade2_end:
-                    extreme_by_decade["decade2"]["count"] += 1
-                    extreme_by_decade["decade2"]["events"].append(event)
-                else:
-                    extreme_by_decade["decade3"]["count"] += 1
-                    extreme_by_decade["decade3"]["events"].append(event)
-
-        # Sort and limit events per decade
-        for d in extreme_by_decade.values():
-            d["events"] = sorted(d["events"], key=lambda x: x["precipitation_mm"], reverse=True)[:5]
-
         return {
             "period_analyzed": f"{min_year}-{max_year}",
             "decades": {
@@ -479,7 +615,6 @@ class FloodPatternAnalyzer:
         Results are cached for 24 hours. Cache key includes yesterday's date
         to ensure data is refreshed daily.
         """
-        from datetime import date
         yesterday = date.today() - timedelta(days=1)
         cache_key = f"{district}_{years}_{yesterday.isoformat()}"
 
@@ -498,27 +633,28 @@ class FloodPatternAnalyzer:
         logger.info(f"Fetching historical data for {district} ({start_year}-{end_year})...")
 
         # Fetch historical rainfall data
-        rainfall_data = await self.fetch_historical_rainfall(
+        rainfall = await self.fetch_historical_rainfall(
             coords["lat"], coords["lon"],
             start_year, end_year
         )
 
-        if not rainfall_data:
+        if not len(rainfall):
             return {"error": "Failed to fetch historical data"}
 
-        logger.info(f"Analyzing {len(rainfall_data)} days of data...")
+        logger.info(f"Analyzing {len(rainfall)} days of data...")
 
         # Run analyses
-        monthly_patterns = self.analyze_monthly_patterns(rainfall_data)
-        seasonal_patterns = self.analyze_seasonal_patterns(rainfall_data)
-        extreme_events = self.analyze_extreme_events(rainfall_data)
-        yearly_trends = self.analyze_yearly_trends(rainfall_data)
+        monthly_patterns = self.analyze_monthly_patterns(rainfall)
+        seasonal_patterns = self.analyze_seasonal_patterns(rainfall)
+        extreme_events = self.analyze_extreme_events(rainfall)
+        yearly_trends = self.analyze_yearly_trends(rainfall)
         flood_risk_months = self.get_flood_risk_by_month(monthly_patterns)
-        climate_change = self.analyze_climate_change_trends(rainfall_data, yearly_trends)
+        climate_change = self.analyze_climate_change_trends(rainfall, yearly_trends)
 
-        # Calculate summary statistics
-        total_records = len(rainfall_data)
-        all_precip = [r["precipitation_mm"] for r in rainfall_data]
+        # Calculate summary statistics (one vectorized reduction each)
+        total_records = len(rainfall)
+        precip = rainfall.precip
+        total_rainfall = float(precip.sum())
 
         result = {
             "district": district,
@@ -526,13 +662,13 @@ class FloodPatternAnalyzer:
             "period": f"{start_year}-{end_year}",
             "total_days_analyzed": total_records,
             "summary": {
-                "total_rainfall_mm": round(sum(all_precip), 1),
-                "avg_annual_rainfall_mm": round(sum(all_precip) / max(1, years), 1),
-                "avg_daily_rainfall_mm": round(statistics.mean(all_precip), 2) if all_precip else 0,
-                "max_daily_rainfall_mm": round(max(all_precip), 1) if all_precip else 0,
-                "rainy_days_total": len([p for p in all_precip if p > 1]),
-                "heavy_rain_days": len([p for p in all_precip if p > 50]),
-                "extreme_rain_days": len([p for p in all_precip if p > 100]),
+                "total_rainfall_mm": round(total_rainfall, 1),
+                "avg_annual_rainfall_mm": round(total_rainfall / max(1, years), 1),
+                "avg_daily_rainfall_mm": round(total_rainfall / total_records, 2),
+                "max_daily_rainfall_mm": round(float(precip.max()), 1),
+                "rainy_days_total": int((precip > 1).sum()),
+                "heavy_rain_days": int((precip > 50).sum()),
+                "extreme_rain_days": int((precip > 100).sum()),
             },
             "monthly_patterns": monthly_patterns,
             "seasonal_patterns": seasonal_patterns,
@@ -565,17 +701,22 @@ class FloodPatternAnalyzer:
 
         risk_scores = {"HIGH": 3, "MEDIUM": 2, "LOW": 1}
 
-        for district in key_districts:
-            try:
-                analysis = await self.run_full_analysis(district, years=30)
-                if "error" not in analysis:
-                    for month, data in analysis["monthly_patterns"].items():
-                        all_monthly[month]["rainfall"].append(data["avg_monthly_rainfall_mm"])
-                        all_monthly[month]["risk_scores"].append(risk_scores.get(data["flood_risk"], 1))
+        # Districts are independent; analyze them concurrently on the shared client
+        analyses = await asyncio.gather(
+            *(self.run_full_analysis(district, years=30) for district in key_districts),
+            return_exceptions=True,
+        )
+
+        for district, analysis in zip(key_districts, analyses):
+            if isinstance(analysis, Exception):
+                logger.warning(f"Failed analysis for {district}: {analysis}")
+                continue
+            if "error" not in analysis:
+                for month, data in analysis["monthly_patterns"].items():
+                    all_monthly[month]["rainfall"].append(data["avg_monthly_rainfall_mm"])
+                    all_monthly[month]["risk_scores"].append(risk_scores.get(data["flood_risk"], 1))
 
-                    all_extreme.extend(analysis["extreme_events"])
-            except Exception as e:
-                logger.warning(f"Failed analysis for {district}: {e}")
+                all_extreme.extend(analysis["extreme_events"])
 
         # Aggregate monthly patterns
         national_monthly = {}
@@ -596,13 +737,13 @@ class FloodPatternAnalyzer:
                 "flood_risk": risk_level,
             }
 
-        # Sort extreme events
-        all_extreme.sort(key=lambda x: x["precipitation_mm"], reverse=True)
+        # Top extreme events across districts
+        top_extreme = heapq.nlargest(30, all_extreme, key=lambda x: x["precipitation_mm"])
 
         return {
             "districts_analyzed": key_districts,
             "monthly_patterns": national_monthly,
-            "top_extreme_events": all_extreme[:30],
+            "top_extreme_events": top_extreme,
             "peak_flood_months": [
                 m for m, d in national_monthly.items()
                 if d["flood_risk"] == "HIGH"
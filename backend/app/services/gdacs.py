@@ -5,6 +5,7 @@ import logging
 from xml.etree import ElementTree
 
 from ..config import get_settings
+from ..http_client import get_http_client
 from ..services.districts_service import get_bounding_box
 
 logger = logging.getLogger(__name__)
@@ -34,17 +35,17 @@ class GDACSService:
             "country": "LKA"  # Sri Lanka ISO code
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-
-                # GDACS returns XML
-                alerts = self._parse_gdacs_response(response.text)
-                return self._filter_by_bounding_box(alerts)
-            except httpx.HTTPError as e:
-                logger.error(f"GDACS API error: {e}")
-                return []
+        client = get_http_client()
+        try:
+            response = await client.get(self.base_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+
+            # GDACS returns XML
+            alerts = self._parse_gdacs_response(response.text)
+            return self._filter_by_bounding_box(alerts)
+        except httpx.HTTPError as e:
+            logger.error(f"GDACS API error: {e}")
+            return []
 
     def _parse_gdacs_response(self, xml_content: str) -> list[dict]:
         """Parse GDACS XML response into list of alerts."""
@@ -4,10 +4,12 @@ Provides real-time traffic speeds and congestion levels for Sri Lanka roads.
 """
 import httpx
 import logging
+from collections import Counter
 from typing import Optional
 from datetime import datetime
 
 from ..config import get_settings
+from .single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,7 @@ SRI_LANKA_ROADS = [
 ]
 
 
-class HereTrafficFlowService:
+class HereTrafficFlowService(SingleFlightCache):
     """Service for fetching real-time traffic flow data from HERE"""
 
     BASE_URL = "https://data.traffic.hereapi.com/v7/flow"
@@ -166,6 +168,9 @@ class HereTrafficFlowService:
         """Get cached traffic flow data"""
         return self._cache
 
+    async def _refresh(self):
+        await self.fetch_all_flow_data()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
@@ -187,20 +192,12 @@ class HereTrafficFlowService:
                 "avg_jam_factor": 0,
             }
 
-        congestion_counts = {
-            "free": 0,
-            "light": 0,
-            "moderate": 0,
-            "heavy": 0,
-            "severe": 0,
-        }
+        congestion_counts = Counter(loc.get("congestion", "free") for loc in self._cache)
 
         total_speed = 0
         total_jam = 0
 
         for loc in self._cache:
-            congestion = loc.get("congestion", "free")
-            congestion_counts[congestion] = congestion_counts.get(congestion, 0) + 1
             total_speed += loc.get("current_speed_kmh", 0)
             total_jam += loc.get("jam_factor", 0)
 
@@ -3,11 +3,13 @@ HERE Destination Weather API integration.
 Provides weather forecasts, observations, and alerts for locations in Sri Lanka.
 """
 import httpx
+import orjson
 import logging
 from typing import Optional
 from datetime import datetime
 
 from ..config import get_settings
+from .single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +71,7 @@ SRI_LANKA_LOCATIONS = [
 ]
 
 
-class HereWeatherService:
+class HereWeatherService(SingleFlightCache):
     """Service for fetching weather data from HERE Destination Weather API"""
 
     BASE_URL = "https://weather.hereapi.com/v3"
@@ -101,7 +103,7 @@ class HereWeatherService:
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.get(url, params=params)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
 
             places = data.get("places", [])
             if not places:
@@ -158,7 +160,7 @@ class HereWeatherService:
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.get(url, params=params)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
 
             places = data.get("places", [])
             if not places:
@@ -213,7 +215,7 @@ class HereWeatherService:
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.get(url, params=params)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
 
             places = data.get("places", [])
             if not places:
@@ -325,6 +327,9 @@ class HereWeatherService:
     def get_cached_alerts(self) -> list[dict]:
         return self._alerts_cache
 
+    async def _refresh(self):
+        await self.fetch_all_observations()
+
     def is_cache_valid(self) -> bool:
         if not self._last_fetch:
             return False
@@ -3,19 +3,24 @@ Intelligence Engine Service
 Automated analysis of SOS data + weather to produce actionable intelligence
 Now enhanced with GeoNames elevation data for terrain-based flood risk.
 """
-import math
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from datetime import datetime
 from collections import defaultdict
 import logging
 
+import numpy as np
+
 from .sos_fetcher import sos_fetcher
 from .weather_cache import weather_cache
 from .geonames import get_elevation, calculate_elevation_risk, enrich_location_data
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool for the CPU-bound analysis stages (clustering, summaries)
+_analysis_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="intel-analysis")
+
 
 class IntelEngine:
     """
@@ -39,13 +44,45 @@ class IntelEngine:
     # Cluster radius in kilometers
     CLUSTER_RADIUS_KM = 2.0
 
+    # Minimum age before an empty analysis result is recomputed on demand
+    FRESH_TTL_SECONDS = 30
+
     def __init__(self):
         self._last_analysis: Optional[datetime] = None
         self._cached_priorities: list[dict] = []
         self._cached_clusters: list[dict] = []
         self._cached_summary: dict = {}
+        self._cached_actions: dict = {}
+        # Structure-of-arrays index over _cached_priorities for filtering
+        self._pri_districts: np.ndarray = np.empty(0, dtype=object)
+        self._pri_urgency: np.ndarray = np.empty(0, dtype=object)
+        self._analysis_task: Optional[asyncio.Task] = None
 
     async def run_analysis(self) -> dict:
+        """
+        Run the analysis pipeline, coalescing concurrent callers.
+        If an analysis is already in flight, callers await that one
+        instead of starting another.
+        """
+        if self._analysis_task is None or self._analysis_task.done():
+            self._analysis_task = asyncio.create_task(self._run_analysis())
+        # Shield so a cancelled request doesn't cancel the shared analysis
+        return await asyncio.shield(self._analysis_task)
+
+    async def ensure_fresh(self) -> None:
+        """
+        Run an analysis only if none is cached yet.
+        An empty result is kept for FRESH_TTL_SECONDS before retrying.
+        """
+        if self._cached_priorities:
+            return
+        if self._last_analysis is not None:
+            age = (datetime.utcnow() - self._last_analysis).total_seconds()
+            if age < self.FRESH_TTL_SECONDS:
+                return
+        await self.run_analysis()
+
+    async def _run_analysis(self) -> dict:
         """
         Main analysis pipeline - runs every 5 minutes.
         Returns complete intelligence package.
@@ -61,16 +98,24 @@ class IntelEngine:
         # 3. Compute priority scores (now async for GeoNames elevation lookup)
         scored_reports = await self._compute_priorities(reports, weather_data)
 
-        # 4. Detect clusters
-        clusters = self._detect_clusters(scored_reports)
-
-        # 5. Generate district summary
-        summary = self._generate_summary(scored_reports, clusters, weather_data)
+        # 4-6. Clustering, summary and actions are CPU-bound; run them on the
+        # analysis pool so request handlers on the event loop stay responsive
+        loop = asyncio.get_running_loop()
+        clusters, summary, actions = await loop.run_in_executor(
+            _analysis_executor, self._analyse_sync, scored_reports, weather_data
+        )
 
         # Cache results
         self._cached_priorities = scored_reports
         self._cached_clusters = clusters
         self._cached_summary = summary
+        self._cached_actions = actions
+        self._pri_districts = np.array(
+            [(r.get("district") or "").lower() for r in scored_reports], dtype=object
+        )
+        self._pri_urgency = np.array(
+            [(r.get("urgency_tier") or "").upper() for r in scored_reports], dtype=object
+        )
         self._last_analysis = datetime.utcnow()
 
         logger.info(
@@ -85,6 +130,21 @@ class IntelEngine:
             "analyzed_at": self._last_analysis.isoformat(),
         }
 
+    def _analyse_sync(
+        self, scored_reports: list[dict], weather_data: list[dict]
+    ) -> tuple[list[dict], dict, dict]:
+        """Synchronous analysis stages: clusters, district summary, actions."""
+        # 4. Detect clusters
+        clusters = self._detect_clusters(scored_reports)
+
+        # 5. Generate district summary
+        summary = self._generate_summary(scored_reports, clusters, weather_data)
+
+        # 6. Precompute recommended actions (top 100 priorities)
+        actions = self._build_actions(scored_reports[:100], clusters, summary)
+
+        return clusters, summary, actions
+
     async def _compute_priorities(
         self, reports: list[dict], weather_data: list[dict]
     ) -> list[dict]:
@@ -249,29 +309,22 @@ class IntelEngine:
             return self._cluster_by_district(reports)
 
         clusters = []
-        used = set()
+        used = np.zeros(len(geo_reports), dtype=bool)
+        lats = np.radians([r["latitude"] for r in geo_reports])
+        lons = np.radians([r["longitude"] for r in geo_reports])
 
         for i, report in enumerate(geo_reports):
-            if i in used:
+            if used[i]:
                 continue
 
             # Start new cluster
-            cluster_reports = [report]
-            used.add(i)
-
-            # Find nearby reports
-            for j, other in enumerate(geo_reports):
-                if j in used:
-                    continue
-
-                distance = self._haversine_distance(
-                    report["latitude"], report["longitude"],
-                    other["latitude"], other["longitude"]
-                )
+            used[i] = True
 
-                if distance <= self.CLUSTER_RADIUS_KM:
-                    cluster_reports.append(other)
-                    used.add(j)
+            # Find nearby unclustered reports (distances to all points at once)
+            distances = self._haversine_km(lats[i], lons[i], lats, lons)
+            nearby = np.flatnonzero(~used & (distances <= self.CLUSTER_RADIUS_KM))
+            used[nearby] = True
+            cluster_reports = [report] + [geo_reports[j] for j in nearby]
 
             # Create cluster if 2+ reports
             if len(cluster_reports) >= 1:
@@ -437,23 +490,137 @@ class IntelEngine:
             "analyzed_at": datetime.utcnow().isoformat(),
         }
 
-    def _haversine_distance(
-        self, lat1: float, lon1: float, lat2: float, lon2: float
-    ) -> float:
-        """Calculate distance between two points in kilometers."""
-        R = 6371  # Earth's radius in km
+    def _build_actions(
+        self,
+        priorities: list[dict],
+        clusters: list[dict],
+        summary: dict
+    ) -> dict:
+        """Build recommended actions from the current analysis."""
+        needs_supplies = summary.get("resource_needs", {})
+        affected_districts = summary.get("most_affected_districts", [])
+        actions = []
+
+        # Action 1: Critical cases needing immediate rescue
+        critical = [p for p in priorities if p.get("urgency_tier") == "CRITICAL"]
+        if critical:
+            actions.append({
+                "priority": 1,
+                "action": "IMMEDIATE_RESCUE",
+                "description": f"Deploy rescue teams to {len(critical)} CRITICAL cases immediately",
+                "targets": [
+                    {
+                        "id": c["id"],
+                        "location": c.get("address") or c.get("district"),
+                        "people": c.get("number_of_people"),
+                        "water_level": c.get("water_level"),
+                        "contact": c.get("phone"),
+                    }
+                    for c in critical[:10]
+                ],
+            })
+
+        # Action 2: Medical emergencies
+        medical = [p for p in priorities if p.get("has_medical_emergency")]
+        if medical:
+            actions.append({
+                "priority": 2,
+                "action": "MEDICAL_RESPONSE",
+                "description": f"Dispatch medical teams to {len(medical)} cases with medical emergencies",
+                "targets": [
+                    {
+                        "id": m["id"],
+                        "location": m.get("address") or m.get("district"),
+                        "people": m.get("number_of_people"),
+                        "contact": m.get("phone"),
+                    }
+                    for m in medical[:10]
+                ],
+            })
+
+        # Action 3: Food and water distribution
+        if needs_supplies.get("needs_water", 0) > 0 or needs_supplies.get("needs_food", 0) > 0:
+            # Find districts with most supply needs
+            districts_needing = sorted(
+                affected_districts,
+                key=lambda d: d.get("needs_water", 0) + d.get("needs_food", 0),
+                reverse=True
+            )[:5]
+
+            actions.append({
+                "priority": 3,
+                "action": "SUPPLY_DISTRIBUTION",
+                "description": f"Distribute supplies: {needs_supplies.get('needs_water', 0)} need water, {needs_supplies.get('needs_food', 0)} need food",
+                "targets": [
+                    {
+                        "district": d["district"],
+                        "needs_water": d.get("needs_water", 0),
+                        "needs_food": d.get("needs_food", 0),
+                        "total_people": d.get("total_people", 0),
+                    }
+                    for d in districts_needing
+                ],
+            })
+
+        # Action 4: Cluster-based rescue operations
+        high_urgency_clusters = [c for c in clusters if c.get("avg_urgency", 0) >= 50]
+        if high_urgency_clusters:
+            actions.append({
+                "priority": 4,
+                "action": "CLUSTER_RESCUE",
+                "description": f"Coordinate rescue operations for {len(high_urgency_clusters)} high-urgency clusters",
+                "targets": [
+                    {
+                        "cluster_id": c["cluster_id"],
+                        "name": c["name"],
+                        "report_count": c["report_count"],
+                        "total_people": c["total_people"],
+                        "centroid": c["centroid"],
+                        "critical_count": c.get("critical_count", 0),
+                    }
+                    for c in high_urgency_clusters[:5]
+                ],
+            })
+
+        # Action 5: Weather escalation warnings
+        escalating_districts = [
+            d for d in affected_districts
+            if d.get("forecast_rain_24h", 0) > 50
+        ]
+        if escalating_districts:
+            actions.append({
+                "priority": 5,
+                "action": "WEATHER_ALERT",
+                "description": f"Issue warnings for {len(escalating_districts)} districts expecting >50mm rain in 24hrs",
+                "targets": [
+                    {
+                        "district": d["district"],
+                        "forecast_rain_24h": d.get("forecast_rain_24h", 0),
+                        "current_cases": d.get("count", 0),
+                    }
+                    for d in escalating_districts
+                ],
+            })
 
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
+        return {
+            "generated_at": summary.get("analyzed_at"),
+            "total_actions": len(actions),
+            "actions": actions,
+        }
+
+    @staticmethod
+    def _haversine_km(
+        lat_rad: float, lon_rad: float, lats_rad: np.ndarray, lons_rad: np.ndarray
+    ) -> np.ndarray:
+        """Distances in kilometers from one point to many (all angles in radians)."""
+        R = 6371  # Earth's radius in km
 
         a = (
-            math.sin(delta_lat / 2) ** 2 +
-            math.cos(lat1_rad) * math.cos(lat2_rad) *
-            math.sin(delta_lon / 2) ** 2
+            np.sin((lats_rad - lat_rad) / 2) ** 2 +
+            np.cos(lat_rad) * np.cos(lats_rad) *
+            np.sin((lons_rad - lon_rad) / 2) ** 2
         )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
         return R * c
 
@@ -461,6 +628,26 @@ class IntelEngine:
         """Get cached priority-ranked reports."""
         return self._cached_priorities[:limit]
 
+    def filter_priorities(
+        self,
+        district: Optional[str] = None,
+        urgency: Optional[str] = None,
+        limit: int = 50,
+        window: int = 200
+    ) -> list[dict]:
+        """
+        Filter the top `window` cached reports by district and/or urgency tier.
+        Uses the pre-normalised SoA arrays so no per-request string folding is needed.
+        """
+        n = min(window, len(self._cached_priorities))
+        mask = np.ones(n, dtype=bool)
+        if district:
+            mask &= self._pri_districts[:n] == district.lower()
+        if urgency:
+            mask &= self._pri_urgency[:n] == urgency.upper()
+
+        return [self._cached_priorities[i] for i in np.flatnonzero(mask)[:limit]]
+
     def get_clusters(self) -> list[dict]:
         """Get cached clusters."""
         return self._cached_clusters
@@ -469,6 +656,10 @@ class IntelEngine:
         """Get cached summary."""
         return self._cached_summary
 
+    def get_actions(self) -> dict:
+        """Get cached recommended actions."""
+        return self._cached_actions
+
     def get_district_intel(self, district: str) -> dict:
         """Get intelligence for a specific district."""
         district_lower = district.lower()
@@ -9,10 +9,13 @@ This provides more accurate data than Navy scraping:
 - District mapping
 """
 import httpx
+from collections import Counter
 from typing import Optional
 from datetime import datetime
 import logging
 
+from .single_flight import SingleFlightCache
+
 logger = logging.getLogger(__name__)
 
 # ArcGIS REST API endpoint (Irrigation Dept)
@@ -420,7 +423,7 @@ DISTRICT_MAP = {
 }
 
 
-class IrrigationFetcher:
+class IrrigationFetcher(SingleFlightCache):
     """Fetches river water levels from Irrigation Department ArcGIS service"""
 
     def __init__(self):
@@ -675,6 +678,9 @@ class IrrigationFetcher:
         """Get cached data without fetching"""
         return self._cache
 
+    async def _refresh(self):
+        await self.fetch_water_levels()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
@@ -696,13 +702,11 @@ class IrrigationFetcher:
             }
 
         status_counts = {"normal": 0, "alert": 0, "minor_flood": 0, "major_flood": 0}
+        status_counts.update(Counter(station.get("status", "normal") for station in data))
+
         highest_risk = None
         highest_pct = 0
-
         for station in data:
-            status = station.get("status", "normal")
-            status_counts[status] = status_counts.get(status, 0) + 1
-
             pct = station.get("pct_to_major_flood", 0)
             if pct > highest_pct:
                 highest_pct = pct
@@ -2,12 +2,13 @@
 Open-Meteo Marine API integration for coastal weather data.
 Provides wave height, sea conditions for coastal flood risk assessment.
 """
-import httpx
 import logging
 from typing import Optional
 from datetime import datetime
 
 from ..config import get_settings
+from ..http_client import get_http_client, conditional_headers, response_validators
+from .single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
@@ -118,14 +119,21 @@ def calculate_coastal_risk(wave_height: float, swell_height: float) -> tuple[str
     return risk_level, factors
 
 
-class MarineWeatherService:
+class MarineWeatherService(SingleFlightCache):
     """Service for fetching marine weather from Open-Meteo"""
 
+    serve_stale = True  # Serve expired data while refreshing in the background
+
     def __init__(self):
         self.settings = get_settings()
         self._cache: list[dict] = []
+        self._by_district_lower: dict[str, dict] = {}
+        self._district_names: tuple[str, ...] = ()
         self._last_fetch: Optional[datetime] = None
         self._cache_duration_seconds = 1800  # 30 minutes
+        # Per-point validators and parsed results, reused on 304 Not Modified
+        self._validators: dict[tuple[float, float], dict] = {}
+        self._point_data: dict[tuple[float, float], dict] = {}
 
     async def fetch_marine_data(self, lat: float, lon: float) -> Optional[dict]:
         """Fetch marine data for a specific location"""
@@ -149,29 +157,37 @@ class MarineWeatherService:
                 "timezone": "Asia/Colombo",
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                current = data.get("current", {})
-                hourly = data.get("hourly", {})
-
-                # Get max wave height in next 24 hours
-                wave_heights = hourly.get("wave_height", [])[:24]
-                swell_heights = hourly.get("swell_wave_height", [])[:24]
-                max_wave_24h = max(wave_heights) if wave_heights else 0
-                max_swell_24h = max(swell_heights) if swell_heights else 0
-
-                return {
-                    "wave_height_m": current.get("wave_height", 0),
-                    "wave_direction": current.get("wave_direction", 0),
-                    "wave_period_s": current.get("wave_period", 0),
-                    "wind_wave_height_m": current.get("wind_wave_height", 0),
-                    "swell_wave_height_m": current.get("swell_wave_height", 0),
-                    "max_wave_24h_m": max_wave_24h,
-                    "max_swell_24h_m": max_swell_24h,
-                }
+            point = (lat, lon)
+            client = get_http_client()
+            response = await client.get(
+                url, params=params, headers=conditional_headers(self._validators.get(point))
+            )
+            if response.status_code == 304 and point in self._point_data:
+                return self._point_data[point]
+            response.raise_for_status()
+            data = response.json()
+
+            current = data.get("current", {})
+            hourly = data.get("hourly", {})
+
+            # Get max wave height in next 24 hours
+            wave_heights = hourly.get("wave_height", [])[:24]
+            swell_heights = hourly.get("swell_wave_height", [])[:24]
+            max_wave_24h = max(wave_heights) if wave_heights else 0
+            max_swell_24h = max(swell_heights) if swell_heights else 0
+
+            result = {
+                "wave_height_m": current.get("wave_height", 0),
+                "wave_direction": current.get("wave_direction", 0),
+                "wave_period_s": current.get("wave_period", 0),
+                "wind_wave_height_m": current.get("wind_wave_height", 0),
+                "swell_wave_height_m": current.get("swell_wave_height", 0),
+                "max_wave_24h_m": max_wave_24h,
+                "max_swell_24h_m": max_swell_24h,
+            }
+            self._validators[point] = response_validators(response)
+            self._point_data[point] = result
+            return result
 
         except Exception as e:
             logger.error(f"Failed to fetch marine data for {lat}, {lon}: {e}")
@@ -206,6 +222,10 @@ class MarineWeatherService:
                 results.append(condition.to_dict())
 
         self._cache = results
+        self._by_district_lower = {}
+        for c in results:
+            self._by_district_lower.setdefault(c["district"].lower(), c)
+        self._district_names = tuple(sorted({c["district"] for c in results}))
         self._last_fetch = datetime.utcnow()
 
         logger.info(f"Fetched marine data for {len(results)} coastal points")
@@ -215,6 +235,18 @@ class MarineWeatherService:
         """Get cached marine data"""
         return self._cache
 
+    def get_by_district(self, district: str) -> Optional[dict]:
+        """Get cached conditions for a district (case-insensitive)"""
+        return self._by_district_lower.get(district.lower())
+
+    @property
+    def district_names(self) -> tuple[str, ...]:
+        """Districts present in the cached data"""
+        return self._district_names
+
+    async def _refresh(self):
+        await self.fetch_all_coastal_data()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
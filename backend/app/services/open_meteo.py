@@ -1,7 +1,10 @@
 import httpx
+import orjson
 from datetime import datetime, timedelta
 import logging
+from typing import Optional
 from ..config import get_settings
+from ..http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -14,15 +17,10 @@ class OpenMeteoService:
         self.base_url = settings.open_meteo_url
         self.timeout = 30.0
 
-    async def get_weather(self, latitude: float, longitude: float, hours: int = 24) -> dict:
-        """
-        Fetch comprehensive weather data for given coordinates.
-        Includes data for rain prediction and danger level calculation.
-        """
+    def _weather_params(self, hours: int) -> dict:
+        """Query parameters shared by single and batched weather requests."""
         forecast_days = max(4, (hours // 24) + 2)
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
+        return {
             "hourly": ",".join([
                 "precipitation",
                 "precipitation_probability",
@@ -52,16 +50,63 @@ class OpenMeteoService:
             "past_days": 3
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
+    async def get_weather(self, latitude: float, longitude: float, hours: int = 24) -> dict:
+        """
+        Fetch comprehensive weather data for given coordinates.
+        Includes data for rain prediction and danger level calculation.
+        """
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            **self._weather_params(hours),
+        }
 
-                return self._parse_response(data, hours)
-            except httpx.HTTPError as e:
-                logger.error(f"Open-Meteo API error: {e}")
-                raise
+        client = get_http_client()
+        try:
+            response = await client.get(self.base_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+
+            return self._parse_response(data, hours)
+        except httpx.HTTPError as e:
+            logger.error(f"Open-Meteo API error: {e}")
+            raise
+
+    async def get_weather_batch(self, coords: list[tuple[float, float]], hours: int = 24) -> list[Optional[dict]]:
+        """
+        Fetch weather for many coordinates in a single Open-Meteo request.
+        Open-Meteo accepts comma-separated latitude/longitude lists and returns
+        one result per location, in the same order. A location whose data can't
+        be parsed comes back as None, so the others are still usable.
+        """
+        if not coords:
+            return []
+
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in coords),
+            "longitude": ",".join(str(lon) for _, lon in coords),
+            **self._weather_params(hours),
+        }
+
+        client = get_http_client()
+        try:
+            response = await client.get(self.base_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            logger.error(f"Open-Meteo API error: {e}")
+            raise
+
+        # A single location comes back as an object rather than a list
+        locations = data if isinstance(data, list) else [data]
+        results = []
+        for lat_lon, location in zip(coords, locations):
+            try:
+                results.append(self._parse_response(location, hours))
+            except Exception as e:
+                logger.error(f"Failed to parse Open-Meteo weather for {lat_lon}: {e}")
+                results.append(None)
+        return results
 
     def _parse_response(self, data: dict, hours: int = 24) -> dict:
         """Parse Open-Meteo API response with danger level calculation."""
@@ -375,7 +420,7 @@ class OpenMeteoService:
                     }
                     response = await client.get(self.base_url, params=params)
                     response.raise_for_status()
-                    data = response.json()
+                    data = orjson.loads(response.content)
 
                     precipitation = data.get("hourly", {}).get("precipitation", [])
                     rainfall_24h = sum(precipitation[:24]) if precipitation else 0.0
@@ -3,16 +3,26 @@ OpenStreetMap Facilities Service
 Fetches nearby hospitals, police stations, shelters from Overpass API
 for emergency response routing.
 """
-import httpx
+import json
 import math
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+from scipy.spatial import cKDTree
+
+from ..http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 OVERPASS_API_URL = "https://overpass-api.de/api/interpreter"
 
+# Pool for parsing Overpass JSON without blocking the event loop
+_parse_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="osm-parse")
+
 # Cache for facilities data (refreshed daily)
 _facilities_cache: Dict[str, Any] = {
     "hospitals": [],
@@ -22,6 +32,15 @@ _facilities_cache: Dict[str, Any] = {
     "last_updated": None
 }
 
+# KD-trees over facility positions (unit-sphere xyz), rebuilt on cache refresh
+_facility_trees: Dict[str, cKDTree] = {}
+
+# Serializes Overpass loads so concurrent cold requests fetch once
+_facilities_lock = asyncio.Lock()
+
+FACILITIES_CACHE_TTL = timedelta(hours=24)
+EARTH_RADIUS_KM = 6371
+
 # Facility types to query
 FACILITY_TYPES = {
     "hospitals": {
@@ -47,21 +66,82 @@ FACILITY_TYPES = {
 }
 
 
-def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two points in kilometers."""
-    R = 6371  # Earth's radius in km
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    delta_lat = math.radians(lat2 - lat1)
-    delta_lon = math.radians(lon2 - lon1)
+def _to_unit_xyz(lats, lons) -> np.ndarray:
+    """Project lat/lon degrees onto the unit sphere so chord length tracks great-circle distance."""
+    lat_rad = np.radians(np.asarray(lats, dtype=float))
+    lon_rad = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+
+def _km_to_chord(distance_km: float) -> float:
+    """Convert a surface distance to the equivalent straight-line distance on the unit sphere."""
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Convert unit-sphere chord lengths back to great-circle distances in km."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
 
-    a = (
-        math.sin(delta_lat / 2) ** 2 +
-        math.cos(lat1_rad) * math.cos(lat2_rad) *
-        math.sin(delta_lon / 2) ** 2
-    )
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+
+def _build_facility_trees(facilities_by_type: Dict[str, List[Dict]]) -> Dict[str, cKDTree]:
+    """Build one KD-tree per facility type from the cached facility lists."""
+    trees = {}
+    for facility_type, facilities in facilities_by_type.items():
+        if facilities:
+            trees[facility_type] = cKDTree(_to_unit_xyz(
+                [f["lat"] for f in facilities],
+                [f["lon"] for f in facilities],
+            ))
+    return trees
+
+
+def _parse_facilities(content: bytes, facility_type: str, config: Dict[str, str]) -> List[Dict]:
+    """Decode an Overpass response and build facility records."""
+    data = json.loads(content)
+    elements = data.get("elements", [])
+
+    facilities = []
+    for el in elements:
+        # Get coordinates (center for ways, direct for nodes)
+        lat = el.get("lat") or el.get("center", {}).get("lat")
+        lon = el.get("lon") or el.get("center", {}).get("lon")
+
+        if lat and lon:
+            tags = el.get("tags", {})
+            facilities.append({
+                "id": el.get("id"),
+                "name": tags.get("name", f"Unknown {config['label']}"),
+                "lat": lat,
+                "lon": lon,
+                "type": facility_type,
+                "label": config["label"],
+                "icon": config["icon"],
+                "emergency": tags.get("emergency", "unknown"),
+                "phone": tags.get("phone") or tags.get("contact:phone"),
+                "address": tags.get("addr:full") or tags.get("addr:street"),
+            })
+
+    return facilities
+
+
+def _is_facilities_cache_valid() -> bool:
+    last_updated = _facilities_cache["last_updated"]
+    return last_updated is not None and datetime.utcnow() - last_updated < FACILITIES_CACHE_TTL
+
+
+async def ensure_facilities_loaded():
+    """Load facilities on a cache miss; returns without awaiting anything on a hit."""
+    if _is_facilities_cache_valid():
+        return
+    async with _facilities_lock:
+        if not _is_facilities_cache_valid():
+            await fetch_all_facilities()
+
+
+def get_facilities() -> Dict[str, Any]:
+    """Get the cached facilities without checking freshness."""
+    return _facilities_cache
 
 
 async def fetch_all_facilities() -> Dict[str, List[Dict]]:
@@ -69,14 +149,12 @@ async def fetch_all_facilities() -> Dict[str, List[Dict]]:
     Fetch all facilities in Sri Lanka from OpenStreetMap.
     Results are cached for 24 hours.
     """
-    global _facilities_cache
+    global _facilities_cache, _facility_trees
 
     # Check cache freshness
-    if _facilities_cache["last_updated"]:
-        age = datetime.utcnow() - _facilities_cache["last_updated"]
-        if age < timedelta(hours=24):
-            logger.info("Using cached facilities data")
-            return _facilities_cache
+    if _is_facilities_cache_valid():
+        logger.info("Using cached facilities data")
+        return _facilities_cache
 
     logger.info("Fetching facilities from OpenStreetMap...")
 
@@ -91,49 +169,33 @@ async def fetch_all_facilities() -> Dict[str, List[Dict]]:
             out center;
             '''
 
-            async with httpx.AsyncClient(timeout=90.0) as client:
-                response = await client.post(
-                    OVERPASS_API_URL,
-                    data={"data": query}
+            client = get_http_client()
+            response = await client.post(
+                OVERPASS_API_URL,
+                data={"data": query},
+                timeout=90.0,
+            )
+
+            if response.status_code == 200:
+                # Overpass responses are large; decode and build off the event loop
+                loop = asyncio.get_running_loop()
+                facilities = await loop.run_in_executor(
+                    _parse_executor, _parse_facilities, response.content, facility_type, config
                 )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    elements = data.get("elements", [])
-
-                    facilities = []
-                    for el in elements:
-                        # Get coordinates (center for ways, direct for nodes)
-                        lat = el.get("lat") or el.get("center", {}).get("lat")
-                        lon = el.get("lon") or el.get("center", {}).get("lon")
-
-                        if lat and lon:
-                            tags = el.get("tags", {})
-                            facilities.append({
-                                "id": el.get("id"),
-                                "name": tags.get("name", f"Unknown {config['label']}"),
-                                "lat": lat,
-                                "lon": lon,
-                                "type": facility_type,
-                                "label": config["label"],
-                                "icon": config["icon"],
-                                "emergency": tags.get("emergency", "unknown"),
-                                "phone": tags.get("phone") or tags.get("contact:phone"),
-                                "address": tags.get("addr:full") or tags.get("addr:street"),
-                            })
-
-                    results[facility_type] = facilities
-                    logger.info(f"Fetched {len(facilities)} {facility_type}")
-
-                else:
-                    logger.warning(f"Failed to fetch {facility_type}: {response.status_code}")
-                    results[facility_type] = _facilities_cache.get(facility_type, [])
+                results[facility_type] = facilities
+                logger.info(f"Fetched {len(facilities)} {facility_type}")
+
+            else:
+                logger.warning(f"Failed to fetch {facility_type}: {response.status_code}")
+                results[facility_type] = _facilities_cache.get(facility_type, [])
 
         except Exception as e:
             logger.error(f"Error fetching {facility_type}: {e}")
             results[facility_type] = _facilities_cache.get(facility_type, [])
 
     # Update cache
+    _facility_trees = _build_facility_trees(results)
     _facilities_cache = {
         **results,
         "last_updated": datetime.utcnow()
@@ -145,6 +207,30 @@ async def fetch_all_facilities() -> Dict[str, List[Dict]]:
     return _facilities_cache
 
 
+def _query_nearest(facility_type: str, lat: float, lon: float, k: int, radius_km: float = math.inf) -> List[Dict]:
+    """Return up to k facilities of a type nearest to (lat, lon), within radius_km."""
+    facilities = _facilities_cache.get(facility_type, [])
+    tree = _facility_trees.get(facility_type)
+    if tree is None or not facilities or k <= 0:
+        return []
+
+    k = min(k, len(facilities))
+    bound = _km_to_chord(radius_km) if math.isfinite(radius_km) else np.inf
+    distances, indices = tree.query(
+        _to_unit_xyz([lat], [lon])[0],
+        k=range(1, k + 1),
+        distance_upper_bound=bound,
+    )
+
+    # Missing neighbours (beyond the radius) come back as inf; the rest are sorted
+    found = np.isfinite(distances)
+    distances_km = np.round(_chord_to_km(distances[found]), 2)
+    return [
+        {**facilities[idx], "distance_km": float(distance)}
+        for idx, distance in zip(indices[found].tolist(), distances_km)
+    ]
+
+
 def find_nearby_facilities(
     lat: float,
     lon: float,
@@ -155,45 +241,16 @@ def find_nearby_facilities(
     Find facilities near a given location.
     Returns nearest facilities of each type within radius.
     """
-    results = {}
-
-    for facility_type in FACILITY_TYPES.keys():
-        facilities = _facilities_cache.get(facility_type, [])
-
-        # Calculate distance and filter
-        nearby = []
-        for f in facilities:
-            distance = _haversine_distance(lat, lon, f["lat"], f["lon"])
-            if distance <= radius_km:
-                nearby.append({
-                    **f,
-                    "distance_km": round(distance, 2)
-                })
-
-        # Sort by distance and limit
-        nearby.sort(key=lambda x: x["distance_km"])
-        results[facility_type] = nearby[:limit_per_type]
-
-    return results
+    return {
+        facility_type: _query_nearest(facility_type, lat, lon, limit_per_type, radius_km)
+        for facility_type in FACILITY_TYPES.keys()
+    }
 
 
 def get_nearest_hospital(lat: float, lon: float) -> Optional[Dict]:
     """Get the nearest hospital to a location."""
-    hospitals = _facilities_cache.get("hospitals", [])
-
-    if not hospitals:
-        return None
-
-    nearest = None
-    min_distance = float("inf")
-
-    for h in hospitals:
-        distance = _haversine_distance(lat, lon, h["lat"], h["lon"])
-        if distance < min_distance:
-            min_distance = distance
-            nearest = {**h, "distance_km": round(distance, 2)}
-
-    return nearest
+    nearest = _query_nearest("hospitals", lat, lon, k=1)
+    return nearest[0] if nearest else None
 
 
 def get_facilities_summary() -> Dict[str, int]:
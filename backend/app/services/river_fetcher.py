@@ -2,16 +2,22 @@
 River Water Level Fetcher Service
 Fetches real-time river water level data from Sri Lanka Navy flood monitoring system
 """
-import httpx
 import re
 from typing import Optional
 from datetime import datetime
 import logging
 
+from ..http_client import get_http_client, conditional_headers, response_validators
+from .single_flight import SingleFlightCache
+
 logger = logging.getLogger(__name__)
 
 NAVY_FLOOD_URL = "https://floodms.navy.lk/wlrs/api/"
 
+# Station statuses; anything unrecognised is grouped under "unknown"
+STATION_STATUSES = ("normal", "alert", "rising", "falling", "unknown")
+SUMMARY_STATUSES = ("normal", "alert", "rising", "falling")  # Reported in endpoint summaries
+
 
 class RiverStation:
     """Represents a river gauging station"""
@@ -60,28 +66,41 @@ class RiverStation:
         }
 
 
-class RiverFetcher:
+class RiverFetcher(SingleFlightCache):
     """Fetches and parses river water level data"""
 
+    serve_stale = True  # Serve expired data while refreshing in the background
+
     def __init__(self):
         self._cache: list[dict] = []
+        self._by_status: dict[str, list[dict]] = {status: [] for status in STATION_STATUSES}
+        self._status_counts: dict[str, int] = dict.fromkeys(STATION_STATUSES, 0)
+        self._summary: dict[str, int] = dict.fromkeys(SUMMARY_STATUSES, 0)
         self._last_fetch: Optional[datetime] = None
+        self._validators: Optional[dict] = None  # ETag/Last-Modified of the cached page
         self._cache_duration_seconds = 300  # 5 minute cache
 
     async def fetch_river_levels(self) -> list[dict]:
         """Fetch river water levels from Navy flood monitoring system"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(NAVY_FLOOD_URL)
-                response.raise_for_status()
-                html = response.text
-
-                stations = self._parse_stations(html)
-                self._cache = [s.to_dict() for s in stations]
+            client = get_http_client()
+            response = await client.get(NAVY_FLOOD_URL, headers=conditional_headers(self._validators))
+            if response.status_code == 304 and self._cache:
+                # Upstream page unchanged - keep the parsed stations
                 self._last_fetch = datetime.utcnow()
-
-                logger.info(f"Fetched {len(stations)} river gauging stations")
+                logger.info("River data unchanged upstream")
                 return self._cache
+            response.raise_for_status()
+            self._validators = response_validators(response)
+            html = response.text
+
+            stations = self._parse_stations(html)
+            self._cache = [s.to_dict() for s in stations]
+            self._index_by_status(self._cache)
+            self._last_fetch = datetime.utcnow()
+
+            logger.info(f"Fetched {len(stations)} river gauging stations")
+            return self._cache
 
         except Exception as e:
             logger.error(f"Failed to fetch river data: {e}")
@@ -176,6 +195,30 @@ class RiverFetcher:
         """Get cached river data without fetching"""
         return self._cache
 
+    def _index_by_status(self, stations: list[dict]):
+        """Group stations by status and count them once per refresh"""
+        by_status = {status: [] for status in STATION_STATUSES}
+        for station in stations:
+            by_status.get(station["status"], by_status["unknown"]).append(station)
+        self._by_status = by_status
+        self._status_counts = {status: len(group) for status, group in by_status.items()}
+        self._summary = {status: self._status_counts[status] for status in SUMMARY_STATUSES}
+
+    def get_by_status(self, status: str) -> Optional[list[dict]]:
+        """Get cached stations with a given status, or None for an unknown status"""
+        return self._by_status.get(status.lower())
+
+    def get_status_counts(self) -> dict[str, int]:
+        """Get cached station counts per status"""
+        return self._status_counts
+
+    def get_cached_summary(self) -> dict[str, int]:
+        """Get cached station summary (normal/alert/rising/falling counts)"""
+        return self._summary
+
+    async def _refresh(self):
+        await self.fetch_river_levels()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
@@ -0,0 +1,70 @@
+"""
+Single-flight refresh for TTL-cached upstream services.
+Concurrent requests that find the cache expired share one in-flight fetch
+instead of each hitting the upstream API.
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCache(ABC):
+    """
+    Base for services exposing is_cache_valid(), an async _refresh(), a
+    _last_fetch timestamp and a _cache_duration_seconds TTL.
+
+    Set serve_stale = True to answer from an expired cache while it is
+    revalidated in the background (stale-while-revalidate).
+    """
+
+    serve_stale: bool = False
+
+    _refresh_task: Optional[asyncio.Task] = None
+    _last_fetch: Optional[datetime] = None
+    _cache_duration_seconds: int = 300
+
+    @property
+    def cache_ttl_seconds(self) -> int:
+        return self._cache_duration_seconds
+
+    @property
+    def stale_since(self) -> Optional[str]:
+        """When the cached data expired (ISO format), or None if still fresh."""
+        if self._last_fetch is None or self.is_cache_valid():
+            return None
+        return (self._last_fetch + timedelta(seconds=self._cache_duration_seconds)).isoformat()
+
+    @abstractmethod
+    def is_cache_valid(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def _refresh(self):
+        ...
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+        return self._refresh_task
+
+    def _log_refresh_error(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{type(self).__name__} refresh failed: {task.exception()}")
+
+    async def refresh(self):
+        """Refresh the cache now, joining any refresh already in flight."""
+        await asyncio.shield(self._start_refresh())
+
+    async def ensure_fresh(self):
+        """Refresh the cache if it has expired (in the background when serving stale)."""
+        if self.is_cache_valid():
+            return
+        if self.serve_stale and self._last_fetch is not None:
+            self._start_refresh()
+            return
+        await self.refresh()
@@ -4,10 +4,12 @@ Provides real-time traffic speeds and travel times for Sri Lanka roads.
 """
 import httpx
 import logging
+from collections import Counter
 from typing import Optional
 from datetime import datetime
 
 from ..config import get_settings
+from .single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +42,7 @@ ROAD_SEGMENTS = [
 ]
 
 
-class TomTomTrafficFlowService:
+class TomTomTrafficFlowService(SingleFlightCache):
     """Service for fetching real-time traffic flow data from TomTom"""
 
     BASE_URL = "https://api.tomtom.com/traffic/services/4/flowSegmentData/absolute/10/json"
@@ -166,6 +168,9 @@ class TomTomTrafficFlowService:
         """Get cached traffic flow data"""
         return self._cache
 
+    async def _refresh(self):
+        await self.fetch_all_flow_data()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
@@ -188,22 +193,12 @@ class TomTomTrafficFlowService:
                 "total_delay_minutes": 0,
             }
 
-        congestion_counts = {
-            "free": 0,
-            "light": 0,
-            "moderate": 0,
-            "heavy": 0,
-            "severe": 0,
-            "closed": 0,
-            "unknown": 0,
-        }
+        congestion_counts = Counter(loc.get("congestion", "unknown") for loc in self._cache)
 
         total_speed = 0
         total_delay = 0
 
         for loc in self._cache:
-            congestion = loc.get("congestion", "unknown")
-            congestion_counts[congestion] = congestion_counts.get(congestion, 0) + 1
             total_speed += loc.get("current_speed_kmh", 0)
             total_delay += loc.get("delay_minutes", 0)
 
@@ -8,6 +8,7 @@ from typing import Optional
 from datetime import datetime
 
 from ..config import get_settings
+from .single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
@@ -124,7 +125,7 @@ class TrafficIncident:
         }
 
 
-class TrafficIncidentsService:
+class TrafficIncidentsService(SingleFlightCache):
     """Service for fetching traffic incidents from HERE"""
 
     BASE_URL = "https://data.traffic.hereapi.com/v7/incidents"
@@ -267,6 +268,9 @@ class TrafficIncidentsService:
         """Get cached traffic incidents"""
         return self._cache
 
+    async def _refresh(self):
+        await self.fetch_incidents()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
@@ -1,6 +1,7 @@
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from ..config import get_settings
@@ -8,6 +9,9 @@ from ..config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Concurrent Twilio sends during a bulk alert
+BULK_SEND_CONCURRENCY = 20
+
 
 class TwilioSMSService:
     """Service for sending SMS via Twilio."""
@@ -60,6 +64,28 @@ class TwilioSMSService:
         )
         return self.send_sms(to_number, message)
 
+    def send_bulk_alert(
+        self,
+        to_numbers: list[str],
+        district: str,
+        alert_level: str,
+        rainfall_mm: float,
+        language: str = "en"
+    ) -> int:
+        """
+        Send one flood alert SMS to many recipients sharing a language.
+        The message is rendered once; returns the number sent successfully.
+        """
+        if not to_numbers:
+            return 0
+        message = self._format_alert_message(
+            district, alert_level, rainfall_mm, language
+        )
+        workers = min(BULK_SEND_CONCURRENCY, len(to_numbers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sms-bulk") as pool:
+            sids = pool.map(lambda number: self.send_sms(number, message), to_numbers)
+            return sum(1 for sid in sids if sid)
+
     def send_confirmation(self, to_number: str, language: str = "en") -> Optional[str]:
         """Send subscription confirmation SMS."""
         messages = {
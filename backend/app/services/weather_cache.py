@@ -5,11 +5,15 @@ Falls back to Open-Meteo if HERE fails.
 """
 import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
 import asyncio
 
+import orjson
+
 from .here_weather import here_weather_service, SRI_LANKA_LOCATIONS
 from .districts_service import get_all_districts
 
@@ -19,6 +23,7 @@ logger = logging.getLogger(__name__)
 CACHE_DIR = Path(__file__).parent.parent.parent / "cache"
 CACHE_FILE = CACHE_DIR / "weather_data.json"
 CACHE_DURATION_MINUTES = 60  # Refresh every 60 minutes to reduce API calls
+CACHE_STALE_MINUTES = 360  # After expiry, serve stale data while revalidating for this long
 
 # Weather source: "here" or "open_meteo"
 WEATHER_SOURCE = "here"
@@ -26,6 +31,33 @@ WEATHER_SOURCE = "here"
 # FREEZE MODE: When True, always serve cached data and never refresh
 CACHE_FREEZE_MODE = False
 
+# Sort rank for forecast alerts (lower = more severe)
+FORECAST_LEVEL_ORDER = {"red": 0, "orange": 1, "yellow": 2}
+
+
+@dataclass(slots=True)
+class ForecastAlert:
+    """A predicted alert for one district/day, built from the cached forecast."""
+    district: str
+    date: str
+    day_name: str
+    alert_level: str
+    predicted_rainfall_mm: float
+    precipitation_probability: float
+    message: str
+    source: str = "forecast"
+
+
+def _get_forecast_message(level: str, rainfall: float, day_name: str) -> str:
+    """Generate a human-readable forecast alert message."""
+    if level == "red":
+        return f"EMERGENCY: Heavy rainfall ({rainfall:.0f}mm) expected on {day_name}. High flood risk."
+    elif level == "orange":
+        return f"WARNING: Significant rainfall ({rainfall:.0f}mm) expected on {day_name}. Moderate flood risk."
+    elif level == "yellow":
+        return f"WATCH: Above normal rainfall ({rainfall:.0f}mm) expected on {day_name}. Be prepared."
+    return f"Normal conditions expected on {day_name}."
+
 
 class WeatherCache:
     """Manages cached weather data for all districts."""
@@ -36,6 +68,14 @@ class WeatherCache:
     def __init__(self):
         self._cache: dict = {}
         self._last_update: Optional[datetime] = None
+        # Forecast alerts memoized per cache update (keyed on _last_update)
+        self._forecast_alerts: list[ForecastAlert] = []
+        self._forecast_alerts_key: Optional[datetime] = None
+        # Serialized get_all_weather payloads per rainfall period (keyed on _last_update)
+        self._all_weather_bytes: dict[int, bytes] = {}
+        self._all_weather_bytes_key: Optional[datetime] = None
+        # Background refresh in flight, so stale reads don't each start one
+        self._refresh_task: Optional[asyncio.Task] = None
         self._ensure_cache_dir()
         self._load_cache_from_disk()
 
@@ -90,6 +130,26 @@ class WeatherCache:
         age = datetime.now(timezone.utc) - self._last_update.replace(tzinfo=timezone.utc)
         return age < timedelta(minutes=CACHE_DURATION_MINUTES)
 
+    @property
+    def last_update(self) -> Optional[datetime]:
+        """When the cached data was last refreshed."""
+        return self._last_update
+
+    def cache_state(self) -> str:
+        """
+        Classify the cache for stale-while-revalidate:
+        "fresh" (valid), "stale" (expired but within the stale window),
+        "expired" (past the stale window but still servable) or "empty".
+        """
+        if self.is_cache_valid():
+            return "fresh"
+        if not self._cache:
+            return "empty"
+        age = self.get_cache_age_seconds()
+        if 0 <= age < (CACHE_DURATION_MINUTES + CACHE_STALE_MINUTES) * 60:
+            return "stale"
+        return "expired"
+
     def get_cache_age_seconds(self) -> int:
         """Get age of cache in seconds."""
         if not self._last_update:
@@ -202,26 +262,30 @@ class WeatherCache:
                     # Fallback to Open-Meteo (original implementation)
                     from .open_meteo import OpenMeteoService
                     weather_service = OpenMeteoService()
-                    districts = get_all_districts()
+                    districts = get_all_districts()[:25]
                     new_cache = {}
 
-                    for district in districts[:25]:  # Limit to avoid rate limits
-                        try:
-                            data = await weather_service.get_weather(
-                                district["latitude"],
-                                district["longitude"],
-                                hours=72
-                            )
-                            new_cache[district["name"]] = {
-                                "district": district["name"],
-                                "latitude": district["latitude"],
-                                "longitude": district["longitude"],
-                                "data": data,
-                                "fetched_at": datetime.now(timezone.utc).isoformat()
-                            }
-                        except Exception as e:
-                            logger.error(f"Failed to fetch weather for {district['name']}: {e}")
-                        await asyncio.sleep(1.5)  # Rate limiting - Open-Meteo needs longer delays
+                    # One multi-location request instead of one (rate-limited) call per district
+                    try:
+                        results = await weather_service.get_weather_batch(
+                            [(d["latitude"], d["longitude"]) for d in districts],
+                            hours=72
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to fetch batched Open-Meteo weather: {e}")
+                        results = []
+
+                    fetched_at = datetime.now(timezone.utc).isoformat()
+                    for district, data in zip(districts, results):
+                        if data is None:
+                            continue
+                        new_cache[district["name"]] = {
+                            "district": district["name"],
+                            "latitude": district["latitude"],
+                            "longitude": district["longitude"],
+                            "data": data,
+                            "fetched_at": fetched_at
+                        }
 
                 if new_cache:
                     self._cache = new_cache
@@ -237,6 +301,12 @@ class WeatherCache:
                 logger.error(f"Weather cache refresh failed: {e}")
                 return False
 
+    def refresh_in_background(self) -> asyncio.Task:
+        """Start a cache refresh without waiting, unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh_cache())
+        return self._refresh_task
+
     def get_all_weather(self, hours: int = 24) -> list[dict]:
         """Get weather data for all districts from cache."""
         from ..routers.weather import get_alert_level
@@ -279,6 +349,21 @@ class WeatherCache:
 
         return result
 
+    def get_all_weather_bytes(self, hours: int = 24) -> bytes:
+        """
+        Get the get_all_weather payload as JSON bytes.
+        Serialized once per cache update and rainfall period.
+        """
+        if self._all_weather_bytes_key != self._last_update or self._last_update is None:
+            self._all_weather_bytes = {}
+            self._all_weather_bytes_key = self._last_update
+
+        payload = self._all_weather_bytes.get(hours)
+        if payload is None:
+            payload = orjson.dumps(self.get_all_weather(hours))
+            self._all_weather_bytes[hours] = payload
+        return payload
+
     def get_district_weather(self, district_name: str) -> Optional[dict]:
         """Get weather data for a specific district from cache."""
         cached = self._cache.get(district_name)
@@ -309,6 +394,36 @@ class WeatherCache:
 
         return result
 
+    def get_forecast_alerts(self) -> list[ForecastAlert]:
+        """
+        Get predicted alerts from the cached 5-day forecast, sorted by date then severity.
+        Computed once per cache update and reused until the next refresh.
+        """
+        if self._forecast_alerts_key == self._last_update and self._forecast_alerts_key is not None:
+            return self._forecast_alerts
+
+        keyed_alerts = []
+        for district in self.get_all_forecast():
+            for day in district.get("forecast_daily", []):
+                alert_level = day.get("forecast_alert_level", "green")
+                if alert_level != "green":
+                    sort_key = (day["date"], FORECAST_LEVEL_ORDER.get(alert_level, 3))
+                    keyed_alerts.append((sort_key, ForecastAlert(
+                        district=district["district"],
+                        date=day["date"],
+                        day_name=day["day_name"],
+                        alert_level=alert_level,
+                        predicted_rainfall_mm=day["total_rainfall_mm"],
+                        precipitation_probability=day["max_precipitation_probability"],
+                        message=_get_forecast_message(alert_level, day["total_rainfall_mm"], day["day_name"]),
+                    )))
+
+        keyed_alerts.sort(key=itemgetter(0))
+
+        self._forecast_alerts = [alert for _, alert in keyed_alerts]
+        self._forecast_alerts_key = self._last_update
+        return self._forecast_alerts
+
     def get_cache_info(self) -> dict:
         """Get cache status information."""
         return {
@@ -316,6 +431,7 @@ class WeatherCache:
             "last_update": self._last_update.isoformat() if self._last_update else None,
             "cache_age_seconds": self.get_cache_age_seconds(),
             "is_valid": self.is_cache_valid(),
+            "state": self.cache_state(),
             "freeze_mode": CACHE_FREEZE_MODE,
             "weather_source": WEATHER_SOURCE,
             "next_refresh_seconds": max(0, CACHE_DURATION_MINUTES * 60 - self.get_cache_age_seconds()) if self._last_update else 0
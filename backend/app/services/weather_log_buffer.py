@@ -0,0 +1,72 @@
+"""
+Buffered WeatherLog writer.
+Request handlers queue weather log rows in memory; they are written in one
+bulk insert by a periodic job (or once the buffer fills), keeping DB
+commits off the GET path.
+"""
+import logging
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import insert
+
+from ..database import SessionLocal
+from ..models import WeatherLog
+
+logger = logging.getLogger(__name__)
+
+WEATHER_LOG_FLUSH_SIZE = 100  # Flush early once this many rows are queued
+WEATHER_LOG_MAX_PENDING = 5000  # Rows kept for retry while the DB is failing; oldest dropped beyond this
+
+_pending: deque[dict] = deque()
+
+
+def queue_weather_log(
+    district: str,
+    rainfall_mm: float,
+    temperature_c: Optional[float],
+    humidity_percent: Optional[int],
+) -> bool:
+    """Queue a weather log row. Returns True when the buffer is due a flush."""
+    _pending.append({
+        "district": district,
+        "rainfall_mm": rainfall_mm,
+        "temperature_c": temperature_c,
+        "humidity_percent": humidity_percent,
+    })
+    return len(_pending) >= WEATHER_LOG_FLUSH_SIZE
+
+
+def flush_weather_logs() -> int:
+    """Write all queued rows in a single bulk insert. Returns the number written."""
+    rows = []
+    while _pending:
+        rows.append(_pending.popleft())
+    if not rows:
+        return 0
+
+    db = SessionLocal()
+    try:
+        # Core insert-many: batched into multi-row INSERT ... VALUES statements
+        # (insertmanyvalues) rather than one statement per row
+        db.execute(insert(WeatherLog), rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to write {len(rows)} weather logs, requeued for retry: {e}")
+        _requeue(rows)
+        return 0
+    finally:
+        db.close()
+
+    return len(rows)
+
+
+def _requeue(rows: list[dict]):
+    """Put unwritten rows back at the front of the buffer, capped at WEATHER_LOG_MAX_PENDING."""
+    _pending.extendleft(reversed(rows))
+    overflow = len(_pending) - WEATHER_LOG_MAX_PENDING
+    if overflow > 0:
+        for _ in range(overflow):
+            _pending.popleft()
+        logger.warning(f"Weather log buffer full; dropped {overflow} oldest rows")
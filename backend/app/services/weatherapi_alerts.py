@@ -2,17 +2,22 @@
 WeatherAPI.com integration for official weather alerts.
 Fetches weather alerts and warnings for Sri Lanka.
 """
-import httpx
 import logging
 from typing import Optional
 from datetime import datetime
 
 from ..config import get_settings
+from ..http_client import get_http_client, conditional_headers, response_validators
+from .single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
 WEATHERAPI_BASE_URL = "https://api.weatherapi.com/v1"
 
+# Alert severities; anything unrecognised is grouped under "Unknown"
+ALERT_SEVERITIES = ("Extreme", "Severe", "Moderate", "Minor", "Unknown")
+SUMMARY_SEVERITIES = ("Extreme", "Severe", "Moderate", "Minor")  # Reported in endpoint summaries
+
 # Sri Lanka major cities for alert coverage
 SRI_LANKA_LOCATIONS = [
     {"name": "Colombo", "query": "Colombo,Sri Lanka", "lat": 6.9271, "lon": 79.8612},
@@ -66,14 +71,22 @@ class WeatherAlert:
         }
 
 
-class WeatherAPIService:
+class WeatherAPIService(SingleFlightCache):
     """Service for fetching weather alerts from WeatherAPI.com"""
 
+    serve_stale = True  # Serve expired data while refreshing in the background
+
     def __init__(self):
         self.settings = get_settings()
         self._cache: list[dict] = []
+        self._by_severity: dict[str, list[dict]] = {s.lower(): [] for s in ALERT_SEVERITIES}
+        self._severity_counts: dict[str, int] = dict.fromkeys(SUMMARY_SEVERITIES, 0)
+        self._summary: dict[str, int] = {s.lower(): 0 for s in SUMMARY_SEVERITIES}
         self._last_fetch: Optional[datetime] = None
         self._cache_duration_seconds = 900  # 15 minutes
+        # Per-location validators and parsed alerts, reused on 304 Not Modified
+        self._validators: dict[str, dict] = {}
+        self._location_alerts: dict[str, list[WeatherAlert]] = {}
 
     def _get_api_key(self) -> str:
         return self.settings.weatherapi_key
@@ -92,28 +105,34 @@ class WeatherAPIService:
                 "q": query,
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                alerts = []
-                alert_data = data.get("alerts", {}).get("alert", [])
-
-                for alert in alert_data:
-                    alerts.append(WeatherAlert(
-                        headline=alert.get("headline", ""),
-                        severity=alert.get("severity", "Unknown"),
-                        urgency=alert.get("urgency", "Unknown"),
-                        event=alert.get("event", "Weather Alert"),
-                        effective=alert.get("effective", ""),
-                        expires=alert.get("expires", ""),
-                        description=alert.get("desc", ""),
-                        instruction=alert.get("instruction", ""),
-                        areas=alert.get("areas", "").split("; ") if alert.get("areas") else [],
-                    ))
-
-                return alerts
+            client = get_http_client()
+            response = await client.get(
+                url, params=params, headers=conditional_headers(self._validators.get(query))
+            )
+            if response.status_code == 304 and query in self._location_alerts:
+                return self._location_alerts[query]
+            response.raise_for_status()
+            data = response.json()
+
+            alerts = []
+            alert_data = data.get("alerts", {}).get("alert", [])
+
+            for alert in alert_data:
+                alerts.append(WeatherAlert(
+                    headline=alert.get("headline", ""),
+                    severity=alert.get("severity", "Unknown"),
+                    urgency=alert.get("urgency", "Unknown"),
+                    event=alert.get("event", "Weather Alert"),
+                    effective=alert.get("effective", ""),
+                    expires=alert.get("expires", ""),
+                    description=alert.get("desc", ""),
+                    instruction=alert.get("instruction", ""),
+                    areas=alert.get("areas", "").split("; ") if alert.get("areas") else [],
+                ))
+
+            self._validators[query] = response_validators(response)
+            self._location_alerts[query] = alerts
+            return alerts
 
         except Exception as e:
             logger.error(f"Failed to fetch alerts for {query}: {e}")
@@ -138,6 +157,7 @@ class WeatherAPIService:
                     all_alerts.append(alert_dict)
 
         self._cache = all_alerts
+        self._index_by_severity(all_alerts)
         self._last_fetch = datetime.utcnow()
 
         logger.info(f"Fetched {len(all_alerts)} weather alerts for Sri Lanka")
@@ -158,40 +178,40 @@ class WeatherAPIService:
                 "alerts": "yes",
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                current = data.get("current", {})
-                location = data.get("location", {})
-                alerts = data.get("alerts", {}).get("alert", [])
-
-                return {
-                    "location": location.get("name"),
-                    "region": location.get("region"),
-                    "country": location.get("country"),
-                    "lat": location.get("lat"),
-                    "lon": location.get("lon"),
-                    "temp_c": current.get("temp_c"),
-                    "humidity": current.get("humidity"),
-                    "wind_kph": current.get("wind_kph"),
-                    "wind_dir": current.get("wind_dir"),
-                    "pressure_mb": current.get("pressure_mb"),
-                    "precip_mm": current.get("precip_mm"),
-                    "cloud": current.get("cloud"),
-                    "condition": current.get("condition", {}).get("text"),
-                    "condition_icon": current.get("condition", {}).get("icon"),
-                    "alerts_count": len(alerts),
-                    "alerts": [
-                        {
-                            "headline": a.get("headline"),
-                            "severity": a.get("severity"),
-                            "event": a.get("event"),
-                        }
-                        for a in alerts
-                    ],
-                }
+            client = get_http_client()
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            current = data.get("current", {})
+            location = data.get("location", {})
+            alerts = data.get("alerts", {}).get("alert", [])
+
+            return {
+                "location": location.get("name"),
+                "region": location.get("region"),
+                "country": location.get("country"),
+                "lat": location.get("lat"),
+                "lon": location.get("lon"),
+                "temp_c": current.get("temp_c"),
+                "humidity": current.get("humidity"),
+                "wind_kph": current.get("wind_kph"),
+                "wind_dir": current.get("wind_dir"),
+                "pressure_mb": current.get("pressure_mb"),
+                "precip_mm": current.get("precip_mm"),
+                "cloud": current.get("cloud"),
+                "condition": current.get("condition", {}).get("text"),
+                "condition_icon": current.get("condition", {}).get("icon"),
+                "alerts_count": len(alerts),
+                "alerts": [
+                    {
+                        "headline": a.get("headline"),
+                        "severity": a.get("severity"),
+                        "event": a.get("event"),
+                    }
+                    for a in alerts
+                ],
+            }
 
         except Exception as e:
             logger.error(f"Failed to fetch weather for {query}: {e}")
@@ -201,6 +221,31 @@ class WeatherAPIService:
         """Get cached alerts"""
         return self._cache
 
+    def _index_by_severity(self, alerts: list[dict]):
+        """Group alerts by severity (lowercase key) and count them once per refresh"""
+        by_severity = {s.lower(): [] for s in ALERT_SEVERITIES}
+        for alert in alerts:
+            severity = (alert["severity"] or "").lower()
+            by_severity.get(severity, by_severity["unknown"]).append(alert)
+        self._by_severity = by_severity
+        self._severity_counts = {s: len(by_severity[s.lower()]) for s in SUMMARY_SEVERITIES}
+        self._summary = {s.lower(): len(by_severity[s.lower()]) for s in SUMMARY_SEVERITIES}
+
+    def get_by_severity(self, severity: str) -> Optional[list[dict]]:
+        """Get cached alerts with a given severity, or None for an unknown severity"""
+        return self._by_severity.get(severity.lower())
+
+    def get_severity_counts(self) -> dict[str, int]:
+        """Get cached alert counts per severity (Extreme/Severe/Moderate/Minor)"""
+        return self._severity_counts
+
+    def get_cached_summary(self) -> dict[str, int]:
+        """Get cached alert summary keyed by lowercase severity"""
+        return self._summary
+
+    async def _refresh(self):
+        await self.fetch_all_alerts()
+
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid"""
         if not self._last_fetch:
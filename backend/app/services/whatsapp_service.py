@@ -3,8 +3,10 @@ WhatsApp Service via Twilio
 Sends flood alerts via Twilio's WhatsApp API
 """
 from twilio.rest import Client
-from twilio.base.exceptions import TwilioException
+from twilio.base.exceptions import TwilioException, TwilioRestException
+import asyncio
 import logging
+import random
 from typing import Optional
 from datetime import datetime
 
@@ -12,6 +14,16 @@ from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Characters dropped when normalizing phone numbers
+_PHONE_STRIP = str.maketrans("", "", "+ -")
+
+# Concurrent Twilio sends during a bulk broadcast
+BULK_SEND_CONCURRENCY = 20
+
+# Retries for rate-limited (HTTP 429) sends, with jittered exponential backoff
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF_SECONDS = 1.0
+
 
 class WhatsAppService:
     """Service for sending WhatsApp messages via Twilio"""
@@ -36,7 +48,7 @@ class WhatsAppService:
 
     def _format_whatsapp_number(self, phone: str) -> str:
         """Format phone number for Twilio WhatsApp (whatsapp:+XXXXXXXXXXX)"""
-        phone = phone.replace("+", "").replace(" ", "").replace("-", "")
+        phone = phone.translate(_PHONE_STRIP)
         if not phone.startswith("whatsapp:"):
             phone = f"whatsapp:+{phone}"
         return phone
@@ -45,7 +57,7 @@ class WhatsAppService:
         """Get the from WhatsApp number in Twilio format"""
         num = self.settings.twilio_whatsapp_number
         if not num.startswith("whatsapp:"):
-            num = num.replace("+", "").replace(" ", "")
+            num = num.translate(_PHONE_STRIP)
             num = f"whatsapp:+{num}"
         return num
 
@@ -72,11 +84,7 @@ class WhatsAppService:
         from_whatsapp = self._get_from_number()
 
         try:
-            msg = self.client.messages.create(
-                body=message,
-                from_=from_whatsapp,
-                to=to_whatsapp
-            )
+            msg = await self._create_message(message, from_whatsapp, to_whatsapp)
 
             self._log_message(to_phone, message, "sent", msg.sid)
             logger.info(f"WhatsApp message sent to {to_phone}: {msg.sid}")
@@ -94,6 +102,20 @@ class WhatsAppService:
             self._log_message(to_phone, message, "failed", error=error_msg)
             return {"success": False, "error": error_msg}
 
+    async def _create_message(self, body: str, from_: str, to: str):
+        """Create a Twilio message off the event loop, backing off on 429 responses."""
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                # The Twilio client is blocking; run it in a worker thread
+                return await asyncio.to_thread(
+                    self.client.messages.create, body=body, from_=from_, to=to
+                )
+            except TwilioRestException as e:
+                if e.status != 429 or attempt == RATE_LIMIT_RETRIES:
+                    raise
+                delay = RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
     async def send_alert_message(
         self,
         to_phone: str,
@@ -118,6 +140,30 @@ class WhatsAppService:
 
         return await self.send_text_message(to_phone, message)
 
+    async def send_bulk_alert(
+        self,
+        to_phones: list[str],
+        district: str,
+        alert_level: str,
+        rainfall_mm: float,
+        language: str = "en",
+    ) -> int:
+        """
+        Send one flood alert to many recipients sharing a language.
+        The message is rendered once; returns the number sent successfully.
+        """
+        message = self._build_alert_message(
+            district, alert_level, rainfall_mm, language
+        )
+        semaphore = asyncio.Semaphore(BULK_SEND_CONCURRENCY)
+
+        async def send(phone: str) -> dict:
+            async with semaphore:
+                return await self.send_text_message(phone, message)
+
+        results = await asyncio.gather(*(send(phone) for phone in to_phones))
+        return sum(1 for result in results if result.get("success"))
+
     def _build_alert_message(
         self,
         district: str,
@@ -189,21 +235,23 @@ class WhatsAppService:
         failed = 0
         errors = []
 
-        for sub in subscribers:
-            phone = sub.get("phone_number")
-            lang = sub.get("language", "en")
+        recipients = [sub for sub in subscribers if sub.get("phone_number")]
+        semaphore = asyncio.Semaphore(BULK_SEND_CONCURRENCY)
 
-            if not phone:
-                continue
+        async def send(sub: dict) -> dict:
+            async with semaphore:
+                return await self.send_alert_message(
+                    to_phone=sub["phone_number"],
+                    district=district,
+                    alert_level=alert_level,
+                    rainfall_mm=rainfall_mm,
+                    language=sub.get("language", "en"),
+                )
 
-            result = await self.send_alert_message(
-                to_phone=phone,
-                district=district,
-                alert_level=alert_level,
-                rainfall_mm=rainfall_mm,
-                language=lang,
-            )
+        results = await asyncio.gather(*(send(sub) for sub in recipients))
 
+        for sub, result in zip(recipients, results):
+            phone = sub["phone_number"]
             if result.get("success"):
                 sent += 1
             else:
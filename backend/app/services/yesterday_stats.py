@@ -0,0 +1,222 @@
+"""
+Yesterday's rainfall statistics for all districts.
+Fetched from Open-Meteo once per day and cached on disk and in memory,
+since yesterday's data won't change.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+import orjson
+
+from ..config import get_settings
+from ..http_client import get_http_client
+from .districts_service import get_all_districts
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Cache file for yesterday's stats - persists across restarts
+YESTERDAY_STATS_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "cache", "yesterday_stats.json"
+)
+
+# Lock to prevent concurrent fetches of yesterday stats
+_yesterday_stats_lock = asyncio.Lock()
+
+# In-process copy of yesterday's stats, so repeat hits skip the file read
+_yesterday_stats_mem: Optional[dict] = None
+
+
+def _load_yesterday_stats_cache():
+    """Load cached yesterday stats if valid for today."""
+    global _yesterday_stats_mem
+    yesterday_str = (date.today() - timedelta(days=1)).isoformat()
+    if _yesterday_stats_mem is not None and _yesterday_stats_mem.get("date") == yesterday_str:
+        return _yesterday_stats_mem
+    try:
+        if os.path.exists(YESTERDAY_STATS_CACHE_FILE):
+            with open(YESTERDAY_STATS_CACHE_FILE, "rb") as f:
+                cached = orjson.loads(f.read())
+            # Check if cache is for yesterday's date
+            if cached.get("date") == yesterday_str:
+                _yesterday_stats_mem = cached
+                return cached
+    except Exception:
+        pass
+    return None
+
+
+def _save_yesterday_stats_cache(stats: dict):
+    """Save yesterday stats to cache file (atomically, so readers never see a partial file)."""
+    global _yesterday_stats_mem
+    _yesterday_stats_mem = stats
+    cache_dir = os.path.dirname(YESTERDAY_STATS_CACHE_FILE)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(stats))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, YESTERDAY_STATS_CACHE_FILE)
+    except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+# Shared fallbacks for missing Open-Meteo daily series
+_ZERO_SERIES = (0,)
+_NONE_SERIES = (None,)
+
+
+def _parse_yesterday_daily(district: dict, location: dict) -> Optional[dict]:
+    """Extract yesterday's rainfall and temperatures for a district from an Open-Meteo location result."""
+    daily = location.get("daily") or {}
+    precip_sum = daily.get("precipitation_sum")
+    if not precip_sum:
+        return None
+
+    precip = precip_sum[0] or 0
+    rain = (daily.get("rain_sum") or _ZERO_SERIES)[0] or 0
+    rainfall = max(precip, rain)
+    temp_max = (daily.get("temperature_2m_max") or _NONE_SERIES)[0]
+    temp_min = (daily.get("temperature_2m_min") or _NONE_SERIES)[0]
+
+    return {
+        "district": district["name"],
+        "rainfall_mm": round(rainfall, 1),
+        "temp_max_c": round(temp_max, 1) if temp_max else None,
+        "temp_min_c": round(temp_min, 1) if temp_min else None
+    }
+
+
+async def _compute_yesterday_stats() -> dict:
+    """Fetch yesterday's weather for every district and summarize it."""
+    yesterday = date.today() - timedelta(days=1)
+    yesterday_str = yesterday.isoformat()
+
+    districts = get_all_districts()
+
+    stats = {
+        "date": yesterday_str,
+        "total_districts": len(districts),
+        "districts_with_rain": 0,
+        "total_rainfall_mm": 0.0,
+        "avg_rainfall_mm": 0.0,
+        "max_rainfall_mm": 0.0,
+        "max_rainfall_district": None,
+        "heavy_rain_districts": [],  # >50mm
+        "moderate_rain_districts": [],  # 25-50mm
+        "light_rain_districts": [],  # >0 and <25mm
+        "dry_districts": [],  # 0mm
+        "district_data": []
+    }
+
+    # One multi-coordinate request for every district; results come back in input order
+    results = []
+    try:
+        resp = await get_http_client().get(
+            settings.open_meteo_url,
+            params={
+                "latitude": ",".join(str(d["latitude"]) for d in districts),
+                "longitude": ",".join(str(d["longitude"]) for d in districts),
+                "past_days": 1,  # Get yesterday's data
+                "daily": "precipitation_sum,rain_sum,temperature_2m_max,temperature_2m_min",
+                "timezone": "Asia/Colombo"
+            },
+            timeout=60.0
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        # A single location comes back as an object rather than a list
+        locations = data if isinstance(data, list) else [data]
+    except Exception as e:
+        logger.error(f"Failed to fetch yesterday's data: {e}")
+        locations = []
+
+    # Parse each location on its own so one malformed entry doesn't drop the rest
+    for district, location in zip(districts, locations):
+        try:
+            results.append(_parse_yesterday_daily(district, location))
+        except Exception as e:
+            logger.warning(f"Failed to parse yesterday's data for {district['name']}: {e}")
+
+    # Process results: bucket every district by rainfall in one vectorized pass
+    district_data = [r for r in results if r is not None]
+    stats["district_data"] = district_data
+
+    if district_data:
+        rainfall = np.array([d["rainfall_mm"] for d in district_data], dtype=float)
+        has_rain = rainfall > 0
+        heavy = rainfall >= 50
+        moderate = (rainfall >= 25) & ~heavy
+        light = has_rain & (rainfall < 25)
+
+        def bucket(mask: np.ndarray) -> list[dict]:
+            return [
+                {"district": district_data[i]["district"], "rainfall_mm": district_data[i]["rainfall_mm"]}
+                for i in np.flatnonzero(mask)
+            ]
+
+        stats["total_rainfall_mm"] = float(rainfall.sum())
+        stats["districts_with_rain"] = int(np.count_nonzero(has_rain))
+        stats["heavy_rain_districts"] = bucket(heavy)
+        stats["moderate_rain_districts"] = bucket(moderate)
+        stats["light_rain_districts"] = bucket(light)
+        stats["dry_districts"] = [district_data[i]["district"] for i in np.flatnonzero(~has_rain)]
+
+        # argmax keeps the first district on ties; all-dry days have no max district
+        max_idx = int(rainfall.argmax())
+        if has_rain[max_idx]:
+            stats["max_rainfall_mm"] = float(rainfall[max_idx])
+            stats["max_rainfall_district"] = district_data[max_idx]["district"]
+
+    # Calculate averages
+    if stats["district_data"]:
+        stats["avg_rainfall_mm"] = round(
+            stats["total_rainfall_mm"] / len(stats["district_data"]), 1
+        )
+
+    stats["total_rainfall_mm"] = round(stats["total_rainfall_mm"], 1)
+    stats["max_rainfall_mm"] = round(stats["max_rainfall_mm"], 1)
+
+    # Sort district data by rainfall (descending)
+    stats["district_data"].sort(key=lambda x: x["rainfall_mm"], reverse=True)
+    stats["heavy_rain_districts"].sort(key=lambda x: x["rainfall_mm"], reverse=True)
+    stats["moderate_rain_districts"].sort(key=lambda x: x["rainfall_mm"], reverse=True)
+
+    return stats
+
+
+async def get_yesterday_stats() -> dict:
+    """
+    Get yesterday's statistics, computing and caching them on the first call of the day.
+    Uses an async lock so concurrent callers trigger a single fetch.
+    """
+    # Check cache first (without lock) - yesterday's data doesn't change
+    cached_stats = _load_yesterday_stats_cache()
+    if cached_stats:
+        return cached_stats
+
+    async with _yesterday_stats_lock:
+        # Double-check cache after acquiring lock (another caller might have filled it)
+        cached_stats = _load_yesterday_stats_cache()
+        if cached_stats:
+            return cached_stats
+
+        stats = await _compute_yesterday_stats()
+
+        # Cache the results for the rest of the day, unless the fetch came back
+        # empty - then the next call retries instead of serving a blank day
+        if stats["district_data"]:
+            _save_yesterday_stats_cache(stats)
+        else:
+            logger.warning("No yesterday stats fetched; not caching")
+
+        return stats
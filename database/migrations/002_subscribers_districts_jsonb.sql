@@ -0,0 +1,27 @@
+-- Store subscriber districts as JSONB so the driver decodes them natively
+-- and containment lookups (districts @> '["Colombo"]') can use a GIN index.
+-- Handles both the TEXT[] column from 001_initial.sql and the TEXT column
+-- (JSON-encoded string) created by SQLAlchemy's create_all.
+
+DROP INDEX IF EXISTS idx_subscribers_districts;
+
+ALTER TABLE subscribers ALTER COLUMN districts DROP DEFAULT;
+
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'subscribers' AND column_name = 'districts') = 'ARRAY' THEN
+        ALTER TABLE subscribers
+            ALTER COLUMN districts TYPE JSONB USING to_jsonb(districts);
+    ELSE
+        ALTER TABLE subscribers
+            ALTER COLUMN districts TYPE JSONB USING COALESCE(NULLIF(districts, ''), '["Colombo"]')::jsonb;
+    END IF;
+END $$;
+
+UPDATE subscribers SET districts = '["Colombo"]'::jsonb WHERE districts IS NULL;
+
+ALTER TABLE subscribers ALTER COLUMN districts SET DEFAULT '["Colombo"]'::jsonb;
+ALTER TABLE subscribers ALTER COLUMN districts SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_subscribers_districts_gin ON subscribers USING GIN(districts);